@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('templates', 'templates'), ('static', 'static'), ('config.json', '.')],
-    hiddenimports=['flask', 'flask_cors', 'werkzeug', 'jinja2', 'werkzeug.utils', 'werkzeug.debug', 'werkzeug.middleware', 'PyQt5', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'PyQt5.QtWebEngineWidgets'],
+    hiddenimports=['flask', 'flask_cors', 'werkzeug', 'jinja2', 'werkzeug.utils', 'werkzeug.debug', 'werkzeug.middleware', 'PyQt5', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'PyQt5.QtWebEngineWidgets', 'src.platforms.windows'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
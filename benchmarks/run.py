@@ -0,0 +1,284 @@
+"""Benchmark the shader library against a synthetic library.
+
+Usage: python -m benchmarks.run [--files 500] [--repeat 5] [--output results.json]
+                                [--baseline baseline.json [--save-baseline]]
+
+Everything runs inside a temporary workspace: GLFS_DATA_DIR, the config
+file, the library, the resource_packs folder and the BetterRenderDragon
+folder all point into it. Timings are taken without tracing; peak memory
+comes from one extra tracemalloc run of each benchmark.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_library, build_mcpack
+from benchmarks.startup import measure_startup
+
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(func, repeat):
+    """Time func over repeat runs, then trace one more run for peak memory"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "runs": len(timings),
+        "first": timings[0],
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+        "peak_bytes": peak
+    }
+
+
+class Workspace:
+    """Temporary library, data dir and game folders for one benchmark run"""
+
+    def __init__(self, files, seed, keep=False):
+        self.root = tempfile.mkdtemp(prefix='glfs-bench-')
+        self.keep = keep
+        self.data_dir = os.path.join(self.root, 'data')
+        self.library = os.path.join(self.root, 'library')
+        self.incoming = os.path.join(self.root, 'incoming')
+        self.resource_packs = os.path.join(self.root, 'resource_packs')
+        self.brd_path = os.path.join(self.root, 'brd')
+        for path in (self.data_dir, self.resource_packs, self.brd_path):
+            os.makedirs(path)
+        self.library_files = generate_library(self.library, files, seed=seed)
+        self.incoming_files = generate_library(self.incoming, max(1, files // 10), seed=seed + 1)
+        # Two revisions of one pack, for full versus delta installs and diffs
+        self.pack_a = os.path.join(self.root, 'pack_a.mcpack')
+        self.pack_b = os.path.join(self.root, 'pack_b.mcpack')
+        build_mcpack(self.pack_a, 'PackA', random.Random(seed), materials=8, total_size=2 * 1024 * 1024)
+        build_mcpack(self.pack_b, 'PackB', random.Random(seed + 2), materials=8, total_size=2 * 1024 * 1024)
+
+    def config(self):
+        return {
+            "minecraft_path": self.root,
+            "shaders_path": self.library,
+            "brd_path": self.brd_path,
+            "theme": "dark",
+            "last_used_shader": "",
+            "presets": {}
+        }
+
+    def cleanup(self):
+        if not self.keep:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def wait_for_job(jobs, response):
+    """Block until the job started by a route response has finished"""
+    job = jobs.get(response.get_json()["job_id"])
+    while job.finished is None:
+        time.sleep(0.001)
+    if job.status != "done":
+        raise RuntimeError(f"{job.kind} job failed: {job.error}")
+    return job
+
+
+def bench_app(workspace, repeat):
+    """Benchmark the Flask routes and the functions behind them"""
+    os.environ['GLFS_DATA_DIR'] = workspace.data_dir
+    from src import core
+    from src.app import app
+    from src.shader_index import ShaderIndex
+    from src.config_store import ConfigStore
+    from src.mcpack_meta import read_pack_manifest
+    from src.material_bin import read_material_summary
+
+    core.config_store = ConfigStore(os.path.join(workspace.root, 'config.json'), core.DEFAULT_CONFIG)
+    core.save_config(workspace.config())
+    core.config_store.flush()
+    core.get_resource_packs_dir = lambda: workspace.resource_packs
+    client = app.test_client()
+    results = {}
+
+    results["config.load"] = measure(core.load_config, repeat * 100)
+
+    def save():
+        core.save_config(core.load_config())
+        core.config_store.flush()
+    results["config.save"] = measure(save, repeat)
+
+    cold_runs = iter(range(repeat + 1))
+
+    def list_cold():
+        index = ShaderIndex(os.path.join(workspace.data_dir, f'cold-{next(cold_runs)}.db'))
+        index.register_extractor('manifest', ('.mcpack',), read_pack_manifest)
+        index.register_extractor('material', ('.bin',), read_material_summary)
+        core.shader_index = index
+        assert client.get('/api/shaders').status_code == 200
+    results["api.shaders.cold"] = measure(list_cold, repeat)
+
+    results["api.shaders.warm"] = measure(lambda: client.get('/api/shaders'), repeat)
+    results["api.shaders.page"] = measure(
+        lambda: client.get('/api/shaders?sort=size&offset=200&limit=100'), repeat * 10)
+    results["api.shaders.search"] = measure(
+        lambda: client.get('/api/shaders?q=shader00&limit=100'), repeat * 10)
+    etag = client.get('/api/shaders?limit=100').headers['ETag']
+    results["api.shaders.not_modified"] = measure(
+        lambda: client.get('/api/shaders?limit=100', headers={'If-None-Match': etag}), repeat * 10)
+    results["get_shaders.rescan"] = measure(
+        lambda: core.get_shaders(workspace.library, refresh=True), repeat)
+
+    def import_batch():
+        for path in workspace.incoming_files:
+            wait_for_job(core.jobs, client.post('/api/shaders/import', json={"path": path}))
+    # The first run copies into the store, later runs hit deduplication
+    results["api.import.batch"] = measure(import_batch, repeat)
+
+    packs = [workspace.pack_a, workspace.pack_b]
+
+    def apply_pack():
+        packs.reverse()
+        wait_for_job(core.jobs, client.post('/api/shaders/apply', json={"path": packs[0]}))
+    # Alternating between two revisions exercises the delta install path
+    results["api.apply.mcpack"] = measure(apply_pack, repeat)
+
+    material = next(p for p in workspace.library_files if p.endswith('.material.bin'))
+    results["api.apply.material"] = measure(
+        lambda: wait_for_job(core.jobs, client.post('/api/shaders/apply', json={"path": material})),
+        repeat)
+
+    results["api.diff.mcpack"] = measure(
+        lambda: client.get('/api/shaders/diff', query_string={"a": workspace.pack_a, "b": workspace.pack_b}),
+        repeat)
+
+    core.config_store.flush()
+    return results
+
+
+def bench_standalone(workspace, repeat):
+    """Benchmark the pywebview API methods of GLFSApp"""
+    from src import standalone
+    from src.platforms import get_platform
+
+    cwd = os.getcwd()
+    os.chdir(workspace.root)
+    try:
+        glfs = standalone.GLFSApp()
+        glfs.config.update(workspace.config())
+        glfs.save_config()
+        results = {}
+        results["standalone.get_shaders"] = measure(glfs.get_shaders, repeat)
+
+        material = os.path.basename(next(p for p in workspace.library_files if p.endswith('.material.bin')))
+        results["standalone.apply_shader"] = measure(lambda: glfs.apply_shader(material), repeat)
+
+        def import_batch():
+            for path in workspace.incoming_files:
+                # Answer the file dialog with the next synthetic file
+                with mock.patch.object(get_platform(), 'ask_open_file', return_value=path):
+                    result = glfs.import_shader()
+                if result["status"] != "ok":
+                    raise RuntimeError(result["message"])
+        results["standalone.import_shader"] = measure(import_batch, repeat)
+
+        glfs.config_store.flush()
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+def compare(results, baseline, tolerance):
+    """List benchmarks whose median time or peak memory regressed past tolerance"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for key in ("median", "peak_bytes"):
+            if base[key] and current[key] > base[key] * (1 + tolerance):
+                regressions.append({
+                    "benchmark": name,
+                    "metric": key,
+                    "baseline": base[key],
+                    "current": current[key],
+                    "ratio": current[key] / base[key]
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GLFS against a synthetic shader library")
+    parser.add_argument("--files", type=int, default=500, help="number of synthetic library files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown or memory growth before failing (default 0.25)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary workspace")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    workspace = Workspace(args.files, args.seed, keep=args.keep)
+    print(f"Generated {args.files} files in {time.perf_counter() - start:.1f}s at {workspace.root}")
+    try:
+        results = bench_app(workspace, args.repeat)
+        results.update(bench_standalone(workspace, args.repeat))
+        for module, result in measure_startup().items():
+            results["startup." + module] = {"runs": 5, "median": result["median"],
+                                            "min": result["min"], "peak_bytes": 0}
+    finally:
+        workspace.cleanup()
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "files": args.files,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    for name, result in results.items():
+        print(f"{name:32} median {result['median'] * 1000:10.2f} ms   peak {result['peak_bytes'] / 1024:10.0f} KiB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+                  f"{regression['baseline']:.6g} -> {regression['current']:.6g} ({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
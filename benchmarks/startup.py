@@ -0,0 +1,71 @@
+"""Measure and budget the import time of GLFS entry modules.
+
+Usage: python -m benchmarks.startup [--runs 5]
+
+Each module is imported in a fresh interpreter with -X importtime and its
+cumulative import time is compared against IMPORT_BUDGETS.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets in seconds
+IMPORT_BUDGETS = {
+    "src.core": 0.10,
+    "src.app": 0.40,
+}
+
+
+def import_time(module):
+    """Import module in a fresh interpreter; returns its cumulative import time in seconds"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def measure_startup(runs=5, modules=None):
+    """Median import time of each budgeted module over runs fresh interpreters"""
+    results = {}
+    for module in modules or IMPORT_BUDGETS:
+        timings = [import_time(module) for _ in range(runs)]
+        results[module] = {
+            "median": statistics.median(timings),
+            "min": min(timings),
+            "budget": IMPORT_BUDGETS.get(module)
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check GLFS module import times against their budgets")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = measure_startup(args.runs)
+    over = [module for module, result in results.items()
+            if result["budget"] is not None and result["median"] > result["budget"]]
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for module, result in results.items():
+            status = "OVER BUDGET" if module in over else "ok"
+            print(f"{module:12} median {result['median'] * 1000:8.1f} ms   "
+                  f"budget {result['budget'] * 1000:8.1f} ms   {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
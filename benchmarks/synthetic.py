@@ -0,0 +1,120 @@
+import os
+import json
+import uuid
+import random
+import struct
+import zipfile
+
+# Share of each file type in a generated library
+DEFAULT_MIX = {".mcpack": 0.6, ".material.bin": 0.3, ".glsl": 0.1}
+
+# (weight, min bytes, max bytes) buckets for generated payload sizes
+SIZE_BUCKETS = [
+    (0.70, 4 * 1024, 64 * 1024),
+    (0.25, 64 * 1024, 1024 * 1024),
+    (0.05, 1024 * 1024, 8 * 1024 * 1024),
+]
+
+
+def _string(text):
+    data = text.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+
+def _payload(rng, size):
+    # Half random, half repeated, so zip compression has something to do
+    half = size // 2
+    return rng.getrandbits(half * 8).to_bytes(half, 'little') + bytes(size - half)
+
+
+def pick_size(rng):
+    """Pick a payload size from SIZE_BUCKETS"""
+    roll = rng.random()
+    for weight, low, high in SIZE_BUCKETS:
+        if roll < weight:
+            return rng.randint(low, high)
+        roll -= weight
+    return SIZE_BUCKETS[-1][2]
+
+
+def build_material_bin(name, rng, passes=3, variants=2, blob_size=4096):
+    """Build a v22 material.bin that src.material_bin can decode"""
+    out = [
+        struct.pack('<Q', 0xA11DA1A),
+        _string("RenderDragon.CompiledMaterialDefinition"),
+        struct.pack('<Q', 22),
+        b'NONE',
+        _string(name),
+        b'\x00',
+        # One buffer, one Vec4 uniform with a default, no overrides
+        b'\x01', _string('s_MatTexture'), struct.pack('<HBBBB', 0, 0, 0, 0, 0),
+        _string('RGBA8'), struct.pack('<IB', 1, 0), b'\x00\x00\x00',
+        struct.pack('<H', 1), _string('u_Color'), struct.pack('<H', 2), b'\x01', bytes(16),
+        struct.pack('<H', 0),
+        struct.pack('<H', passes),
+    ]
+    for pass_index in range(passes):
+        out += [_string(f'Pass{pass_index}'), _string('0' * 16), _string(''), b'\x00',
+                struct.pack('<H', 0), struct.pack('<H', variants)]
+        for variant in range(variants):
+            out += [b'\x01', struct.pack('<H', 1), _string('Fancy'), _string(str(variant % 2)),
+                    struct.pack('<H', 2)]
+            for stage, magic in (('Vertex', b'VSH'), ('Fragment', b'FSH')):
+                blob = magic + b'\x05' + _payload(rng, blob_size - 4)
+                out += [_string(stage), _string('Direct3D_SM65'), b'\x00\x00',
+                        struct.pack('<H', 1), _string('a_position'), bytes(6),
+                        struct.pack('<Q', rng.getrandbits(64)), struct.pack('<I', len(blob)), blob]
+    return b''.join(out)
+
+
+def build_mcpack(path, name, rng, materials=4, total_size=64 * 1024):
+    """Write an .mcpack with a manifest and material.bin members"""
+    manifest = {
+        "format_version": 2,
+        "header": {
+            "name": name,
+            "description": f"Synthetic pack {name}",
+            "uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+            "version": [1, 0, 0],
+            "min_engine_version": [1, 20, 0]
+        },
+        "modules": [{
+            "type": "resources",
+            "uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+            "version": [1, 0, 0]
+        }]
+    }
+    blob_size = max(512, total_size // max(1, materials * 12))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('manifest.json', json.dumps(manifest, indent=4))
+        for index in range(materials):
+            zf.writestr(f'renderer/materials/Material{index}.material.bin',
+                        build_material_bin(f'Material{index}', rng, blob_size=blob_size))
+    return manifest
+
+
+def generate_library(root, count, seed=0, mix=None):
+    """Fill root with count synthetic shader files; returns their paths"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for index in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        size = pick_size(rng)
+        name = f"shader{index:05d}"
+        if kind == ".mcpack":
+            path = os.path.join(root, name + ".mcpack")
+            build_mcpack(path, name, rng, materials=rng.randint(1, 8), total_size=size)
+        elif kind == ".material.bin":
+            path = os.path.join(root, name + ".material.bin")
+            with open(path, 'wb') as f:
+                f.write(build_material_bin(name, rng, passes=rng.randint(1, 6), blob_size=max(512, size // 12)))
+        else:
+            path = os.path.join(root, name + kind)
+            with open(path, 'wb') as f:
+                f.write(_payload(rng, size))
+        paths.append(path)
+    return paths
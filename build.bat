@@ -1,7 +1,11 @@
 @echo off
 echo Installing required packages...
 python -m pip install --upgrade pip
-python -m pip install pyinstaller flask flask-cors pyqt5 pyqtwebengine
+python -m pip install pyinstaller "flask>=2.0.1,<2.1" "werkzeug>=2.0.1,<2.1" flask-cors pyqt5 pyqtwebengine
+
+echo Building static assets...
+python -m src.assets
+if errorlevel 1 exit /b 1
 
 echo Building GLFS executable...
 python -m PyInstaller --noconfirm ^
@@ -23,6 +27,7 @@ python -m PyInstaller --noconfirm ^
     --hidden-import=PyQt5.QtGui ^
     --hidden-import=PyQt5.QtWidgets ^
     --hidden-import=PyQt5.QtWebEngineWidgets ^
+    --hidden-import=src.platforms.windows ^
     src/main.py
 
 echo Build complete! The executable is in the dist folder.
@@ -9,9 +9,14 @@ setup(
     install_requires=[
         "pillow>=9.0.0",
     ],
+    extras_require={
+        # src/server.py builds on Werkzeug's request handler internals
+        'web': ["flask>=2.0.1,<2.1", "werkzeug>=2.0.1,<2.1"],
+    },
     entry_points={
         'console_scripts': [
-            'glfs=src.main:main',
+            'glfs=src.cli:main',
+            'glfs-gui=src.main:main',
         ],
     },
     python_requires='>=3.7',
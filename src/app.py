@@ -1,225 +1,60 @@
 import os
 import sys
-import json
-import shutil
-import datetime
-import subprocess
-import webbrowser
-from pathlib import Path
-import winreg
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import time
+import mimetypes
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, send_file
 from flask_cors import CORS
-import uuid
+from src import core, metrics
+from src.core import (
+    load_config, save_config,
+    check_material_bin_loader, install_material_bin_loader, ensure_shader_watcher,
+    ensure_shader_directories, get_apply_target, apply_shader, import_shader_file,
+    launch_minecraft, save_preset, delete_preset, apply_preset, resolve_preset, jobs, shader_events
+)
+from src.material_diff import diff_paths
+from src.jobs import JobQueueFull
+from src.platforms import get_platform
+from src.thumbnails import is_icon_id
+from src.assets import AssetManifest, is_fingerprinted
 
 # Create Flask app with correct paths
 template_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates'))
 static_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'))
 
+# serve_static handles /static itself; Flask's built-in static route would shadow it
 app = Flask(__name__, 
            template_folder=template_dir,
-           static_folder=static_dir)
+           static_folder=None)
 CORS(app)
 
-# Get the base directory for the application
-if getattr(sys, 'frozen', False):
-    # If the application is run as a bundle (compiled with PyInstaller)
-    base_dir = sys._MEIPASS
-else:
-    # If the application is run from a Python interpreter
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Configuration file path
-config_path = os.path.join(base_dir, 'config.json')
-
-# Configuration
-DEFAULT_CONFIG = {
-    "minecraft_path": "",
-    "shaders_path": "",
-    "brd_path": "",
-    "theme": "dark",
-    "last_used_shader": "",
-    "presets": {}
-}
-
-def load_config():
-    """Load configuration from file"""
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Failed to load configuration: {e}")
-    return DEFAULT_CONFIG.copy()
-
-def save_config(config):
-    """Save configuration to file"""
-    try:
-        with open(config_path, "w") as f:
-            json.dump(config, f, indent=4)
-        return True
-    except Exception as e:
-        print(f"Failed to save configuration: {e}")
-        return False
-
-def detect_minecraft_path():
-    """Auto-detect Minecraft Bedrock installation path"""
-    try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\Microsoft.MinecraftUWP_8wekyb3d8bbwe") as key:
-            install_location = winreg.QueryValueEx(key, "InstallLocation")[0]
-            return install_location
-    except:
-        # Try common installation paths
-        paths = [
-            os.path.expandvars(r"%LocalAppData%\Packages\Microsoft.MinecraftUWP_8wekyb3d8bbwe\LocalState\games\com.mojang"),
-            r"C:\Program Files\WindowsApps\Microsoft.MinecraftUWP_8wekyb3d8bbwe\data"
-        ]
-        for path in paths:
-            if os.path.exists(path):
-                return path
-    return None
-
-def set_default_shaders_path(minecraft_path):
-    """Set default shaders path inside Minecraft directory"""
-    shaders_path = os.path.join(minecraft_path, "renderer", "materials")
-    os.makedirs(shaders_path, exist_ok=True)
-    return shaders_path
-
-def check_material_bin_loader(brd_path):
-    """Check if MaterialBinLoader is installed and working."""
-    try:
-        config = load_config()
-        mc_path = config.get('minecraft_path')
-        if not mc_path:
-            return {"status": "error", "message": "Minecraft path not set"}
-
-        # Check for MaterialBinLoader in the right directory
-        mbl_path = os.path.join(mc_path, "data", "renderer", "materials", "MaterialBinLoader.js")
-        if not os.path.exists(mbl_path):
-            return {"status": "missing", "message": "MaterialBinLoader not installed"}
-
-        return {"status": "ok", "message": "MaterialBinLoader is installed"}
-        
-    except Exception as e:
-        return {"status": "error", "message": f"Error checking MaterialBinLoader status: {str(e)}"}
-
-def install_material_bin_loader(brd_path):
-    """Install or fix MaterialBinLoader"""
-    if not brd_path:
-        return {"status": "error", "message": "BetterRenderDragon path not set"}
-    
-    brd_exe = os.path.join(brd_path, "BetterRenderDragon.exe")
-    if not os.path.exists(brd_exe):
-        return {"status": "error", "message": "BetterRenderDragon.exe not found"}
-
-    try:
-        result = subprocess.run([brd_exe, "--install"], capture_output=True, text=True)
-        if result.returncode == 0:
-            return {"status": "ok", "message": "MaterialBinLoader installed successfully"}
-        else:
-            return {"status": "error", "message": f"Installation failed: {result.stderr}"}
-    except Exception as e:
-        return {"status": "error", "message": f"Error installing MaterialBinLoader: {str(e)}"}
-
-def get_shaders(shaders_path):
-    """Get list of available shaders"""
-    if not shaders_path or not os.path.exists(shaders_path):
-        return []
-    
-    shaders = []
-    for file in os.listdir(shaders_path):
-        if file.endswith(('.glsl', '.hlsl', '.shader', '.mcpack', '.bin')):
-            shader_path = os.path.join(shaders_path, file)
-            shaders.append({
-                "name": file,
-                "path": shader_path,
-                "size": os.path.getsize(shader_path),
-                "modified": datetime.datetime.fromtimestamp(os.path.getmtime(shader_path)).strftime("%Y-%m-%d %H:%M:%S")
-            })
-    return shaders
-
-def ensure_shader_directories():
-    """Create necessary shader directories if they don't exist."""
-    try:
-        # Create GLFS resource pack directory
-        mc_local = os.path.expandvars(r'%LOCALAPPDATA%\Packages\Microsoft.MinecraftUWP_8wekyb3d8bbwe\LocalState\games\com.mojang')
-        resource_pack_dir = os.path.join(mc_local, 'resource_packs', 'glfs_shaders')
-        
-        if not os.path.exists(resource_pack_dir):
-            os.makedirs(resource_pack_dir)
-            
-            # Create manifest.json for the resource pack
-            manifest = {
-                "format_version": 2,
-                "header": {
-                    "description": "GLFS Shaders Resource Pack",
-                    "name": "GLFS Shaders",
-                    "uuid": "3fb8bf01-0f1d-4876-bff7-" + str(uuid.uuid4())[:12],
-                    "version": [1, 0, 0],
-                    "min_engine_version": [1, 19, 0]
-                },
-                "modules": [
-                    {
-                        "description": "GLFS Shaders Resources",
-                        "type": "resources",
-                        "uuid": "5fb8bf02-0f1d-4876-bff7-" + str(uuid.uuid4())[:12],
-                        "version": [1, 0, 0]
-                    }
-                ]
-            }
-            
-            with open(os.path.join(resource_pack_dir, 'manifest.json'), 'w') as f:
-                json.dump(manifest, f, indent=4)
-                
-        return {"status": "ok", "message": "Shader directories created"}
-    except Exception as e:
-        return {"status": "error", "message": f"Error creating shader directories: {str(e)}"}
-
-def apply_shader(shader_path):
-    """Apply a shader by copying it to the resource pack directory."""
-    try:
-        if not os.path.exists(shader_path):
-            return {"status": "error", "message": "Shader file not found"}
-            
-        # Get resource pack directory
-        mc_local = os.path.expandvars(r'%LOCALAPPDATA%\Packages\Microsoft.MinecraftUWP_8wekyb3d8bbwe\LocalState\games\com.mojang')
-        resource_pack_dir = os.path.join(mc_local, 'resource_packs', 'glfs_shaders')
-        
-        # Create materials directory if it doesn't exist
-        materials_dir = os.path.join(resource_pack_dir, 'materials')
-        if not os.path.exists(materials_dir):
-            os.makedirs(materials_dir)
-            
-        # Copy shader to resource pack
-        shader_name = os.path.basename(shader_path)
-        dest_path = os.path.join(materials_dir, shader_name)
-        shutil.copy2(shader_path, dest_path)
-        
-        config = load_config()
-        config["last_used_shader"] = shader_path
-        save_config(config)
-        
-        return {"status": "ok", "message": f"Shader {shader_name} applied successfully"}
-    except Exception as e:
-        return {"status": "error", "message": f"Error applying shader: {str(e)}"}
-
-def launch_minecraft():
-    """Launch Minecraft using the launchminecraft.bat file."""
-    try:
-        config = load_config()
-        brd_path = config.get('brd_path')
-        if not brd_path:
-            return {'status': 'error', 'message': 'BetterRenderDragon path not set'}
-        
-        launch_script = os.path.join(brd_path, 'launchminecraft.bat')
-        if not os.path.exists(launch_script):
-            return {'status': 'error', 'message': 'launchminecraft.bat not found in BRD directory'}
-
-        # Launch using subprocess
-        subprocess.Popen(launch_script, cwd=brd_path, shell=True)
-        return {'status': 'ok', 'message': 'Minecraft is launching...'}
-        
-    except Exception as e:
-        return {'status': 'error', 'message': f'Failed to launch Minecraft: {str(e)}'}
+# Templates link js/css through asset_url() so built assets get hashed names
+assets = AssetManifest(static_dir)
+app.jinja_env.globals['asset_url'] = assets.url
+
+# Requests slower than this many milliseconds are logged (unset or 0 disables)
+SLOW_REQUEST_MS = float(os.environ.get('GLFS_SLOW_REQUEST_MS') or 0)
+
+def job_response(job, message):
+    """Respond to a request that started a background job."""
+    return jsonify({"status": "ok", "message": message, "job_id": job.id, "job": job.to_dict()})
+
+@app.before_request
+def start_request_timer():
+    request.environ['glfs.start'] = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Record per-route latency and log slow requests."""
+    start = request.environ.get('glfs.start')
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.request_duration.observe(elapsed, method=request.method, route=route,
+                                         status=str(response.status_code))
+        if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+            print(f"Slow request: {request.method} {request.full_path.rstrip('?')} "
+                  f"{response.status_code} took {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return response
 
 # Routes
 @app.route('/')
@@ -237,6 +72,15 @@ def init_app():
         # Ensure shader directories exist
         ensure_shader_directories()
         
+        # Back up the game's materials the first time and after game updates
+        materials_dir = core.get_game_materials_dir()
+        if materials_dir and os.path.isdir(materials_dir):
+            try:
+                jobs.submit('snapshot', lambda job: core.snapshot_game_materials(only_if_changed=True, job=job),
+                            target='snapshots')
+            except JobQueueFull:
+                pass
+        
         return {"status": "ok", "message": "App initialized"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -244,9 +88,23 @@ def init_app():
 @app.route('/static/<path:path>')
 def serve_static(path):
     try:
-        return send_from_directory(app.static_folder, path)
+        if not is_fingerprinted(path):
+            response = send_from_directory(static_dir, path)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        # Hashed names never change content, so send the gzip variant if accepted and cache forever
+        gzipped = os.path.join(static_dir, *path.split('/')) + '.gz'
+        if 'gzip' in request.accept_encodings and os.path.isfile(gzipped):
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            response = send_from_directory(static_dir, path + '.gz', mimetype=mimetype)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = send_from_directory(static_dir, path)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
     except Exception as e:
-        print(f"Error serving static file {path}: {e}")
+        print(f"Error serving static file {path}: {e}", file=sys.stderr)
         return f"Error: {str(e)}", 404
 
 @app.route('/api/config', methods=['GET'])
@@ -260,14 +118,75 @@ def update_config():
     new_config = request.json
     config.update(new_config)
     if save_config(config):
+        core.retarget_shader_watcher()
         return jsonify({"status": "ok"})
     return jsonify({"status": "error", "message": "Failed to save configuration"})
 
 @app.route('/api/shaders', methods=['GET'])
 def list_shaders():
+    """List shaders, optionally paged with offset/limit, sorted and filtered by q."""
     config = load_config()
-    shaders = get_shaders(config["shaders_path"])
-    return jsonify(shaders)
+    shaders_path = config["shaders_path"]
+    refresh = request.args.get('refresh') == '1'
+    sort = request.args.get('sort', 'name')
+    q = request.args.get('q', '').strip()
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = request.args.get('limit')
+        limit = max(0, int(limit)) if limit is not None else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "offset and limit must be integers"}), 400
+
+    try:
+        total, shaders, etag = core.query_shaders(shaders_path, sort=sort, q=q, offset=offset,
+                                                  limit=limit, refresh=refresh)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    # Icons render and new files are verified in the background while the client lays out the list
+    core.prefetch_icons(shaders)
+    core.ensure_library_verified(shaders)
+    response = jsonify(shaders)
+    response.headers['X-Total-Count'] = str(total)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route('/api/shaders/<icon_id>/icon', methods=['GET'])
+def shader_icon(icon_id):
+    """Serve a pack icon thumbnail; the id changes with the icon, so it is cached forever."""
+    if not is_icon_id(icon_id):
+        return jsonify({"status": "error", "message": "Invalid icon id"}), 404
+    try:
+        path = core.get_icon_thumbnail(icon_id)
+    except Exception as e:
+        print(f"Error creating thumbnail {icon_id}: {e}", file=sys.stderr)
+        path = None
+    if path is None:
+        return jsonify({"status": "error", "message": "Icon not found"}), 404
+    response = send_file(path, mimetype='image/png', conditional=True)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/shaders/events', methods=['GET'])
+def shader_events_stream():
+    """Stream library add/remove/modify deltas as server-sent events."""
+    ensure_shader_watcher()
+    return Response(shader_events.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/shaders/diff', methods=['GET'])
+def diff_shaders():
+    """Structurally compare two material.bin files or two packs."""
+    old_path = request.args.get('a')
+    new_path = request.args.get('b')
+    if not old_path or not new_path:
+        return jsonify({"status": "error", "message": "Two paths (a and b) are required"}), 400
+    try:
+        result = diff_paths(old_path, new_path, core.section_cache)
+    except (OSError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"Error comparing shaders: {str(e)}"})
+    return jsonify({"status": "ok", "diff": result})
 
 @app.route('/api/shaders/apply', methods=['POST'])
 def api_apply_shader():
@@ -278,8 +197,71 @@ def api_apply_shader():
         if not shader_path:
             return jsonify({"status": "error", "message": "No shader path provided"})
             
-        result = apply_shader(shader_path)
-        return jsonify(result)
+        job = jobs.submit('apply', lambda job: apply_shader(shader_path, job),
+                          target=get_apply_target(shader_path))
+        return job_response(job, f"Applying {os.path.basename(shader_path)}")
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route('/api/presets', methods=['GET'])
+def list_presets():
+    """List presets and the warm slots kept for them."""
+    config = load_config()
+    slots = core.get_preset_slots().slots()
+    return jsonify({"status": "ok", "presets": config.get("presets", {}), "slots": slots})
+
+@app.route('/api/presets', methods=['POST'])
+def api_save_preset():
+    """Save a preset and stage its pack into a warm slot."""
+    data = request.get_json() or {}
+    return jsonify(save_preset(data.get('name'), data.get('path')))
+
+@app.route('/api/presets/<name>', methods=['DELETE'])
+def api_delete_preset(name):
+    return jsonify(delete_preset(name))
+
+@app.route('/api/presets/<name>/apply', methods=['POST'])
+def api_apply_preset(name):
+    """Switch to a preset, instantly if its pack is in a warm slot."""
+    shader_path = resolve_preset(name)
+    if shader_path is None:
+        return jsonify({"status": "error", "message": f"Preset {name} not found"})
+    try:
+        job = jobs.submit('apply', lambda job: apply_preset(name, job), target=get_apply_target(shader_path))
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return job_response(job, f"Applying preset {name}")
+
+@app.route('/api/snapshots', methods=['GET'])
+def list_snapshots():
+    """List snapshots of the game's original materials."""
+    return jsonify({"status": "ok", "snapshots": core.get_snapshot_store().list()})
+
+@app.route('/api/snapshots', methods=['POST'])
+def create_snapshot():
+    """Snapshot the game's materials in the background."""
+    label = (request.get_json(silent=True) or {}).get('label')
+    try:
+        job = jobs.submit('snapshot', lambda job: core.snapshot_game_materials(label, job=job), target='snapshots')
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return job_response(job, "Creating snapshot")
+
+@app.route('/api/snapshots/<snapshot_id>/restore', methods=['POST'])
+def restore_snapshot(snapshot_id):
+    """Restore the game's materials from a snapshot in the background."""
+    try:
+        job = jobs.submit('restore', lambda job: core.restore_game_materials(snapshot_id, job),
+                          target='snapshots')
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return job_response(job, f"Restoring snapshot {snapshot_id}")
+
+@app.route('/api/resource_packs/conflicts', methods=['GET'])
+def resource_pack_conflicts():
+    """List UUIDs shared by more than one installed resource pack."""
+    try:
+        return jsonify({"status": "ok", "conflicts": core.list_pack_conflicts()})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
@@ -291,7 +273,39 @@ def mbl_status():
 @app.route('/api/mbl/install', methods=['POST'])
 def mbl_install():
     config = load_config()
-    return jsonify(install_material_bin_loader(config["brd_path"]))
+    brd_path = config["brd_path"]
+    try:
+        job = jobs.submit('mbl_install', lambda job: install_material_bin_loader(brd_path, job),
+                          target='mbl')
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return job_response(job, "Installing MaterialBinLoader")
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List recent background jobs."""
+    return jsonify([job.to_dict() for job in jobs.list()])
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status, progress and result of a background job."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Request cancellation of a background job."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "ok", "message": "Cancellation requested", "job": job.to_dict()})
+
+@app.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Expose request latencies and internal spans in Prometheus text format."""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/minecraft/launch', methods=['POST'])
 def minecraft_launch():
@@ -299,13 +313,8 @@ def minecraft_launch():
 
 @app.route('/api/dialog/open_folder', methods=['POST'])
 def open_folder_dialog():
-    from tkinter import filedialog, Tk
-    root = Tk()
-    root.withdraw()
-    
     initial_dir = request.json.get('initial_dir', os.path.expanduser('~'))
-    folder = filedialog.askdirectory(initialdir=initial_dir)
-    root.destroy()
+    folder = get_platform().ask_directory(initial_dir=initial_dir)
     
     if folder:
         return jsonify({"status": "ok", "path": folder})
@@ -313,18 +322,10 @@ def open_folder_dialog():
 
 @app.route('/api/dialog/open_file', methods=['POST'])
 def open_file_dialog():
-    from tkinter import filedialog, Tk
-    root = Tk()
-    root.withdraw()
-    
     initial_dir = request.json.get('initial_dir', os.path.expanduser('~'))
     file_types = request.json.get('file_types', [('All Files', '*.*')])
     
-    file = filedialog.askopenfilename(
-        initialdir=initial_dir,
-        filetypes=file_types
-    )
-    root.destroy()
+    file = get_platform().ask_open_file(initial_dir=initial_dir, filetypes=file_types)
     
     if file:
         return jsonify({"status": "ok", "path": file})
@@ -341,31 +342,29 @@ def import_shader():
     if not config["shaders_path"]:
         return jsonify({"status": "error", "message": "Shaders path not set"})
     
+    shaders_path = config["shaders_path"]
     try:
-        # Copy shader to shaders directory
-        shader_name = os.path.basename(shader_path)
-        dest_path = os.path.join(config["shaders_path"], shader_name)
-        shutil.copy2(shader_path, dest_path)
-        return jsonify({
-            "status": "ok",
-            "message": f"Shader {shader_name} imported successfully"
-        })
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Error importing shader: {str(e)}"
-        })
+        job = jobs.submit('import', lambda job: import_shader_file(shader_path, shaders_path, job),
+                          target=os.path.join(shaders_path, os.path.basename(shader_path)))
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return job_response(job, f"Importing {os.path.basename(shader_path)}")
 
 # Main function to run the app
 def main():
-    # For development, run Flask directly
+    from src.server import serve, serve_in_background, server_options
+    options = server_options(load_config())
+    # For development, serve on a fixed port with tracebacks in responses
     if len(sys.argv) > 1 and sys.argv[1] == "--dev":
-        app.run(debug=True, port=5000)
+        app.debug = True
+        serve(app, port=5000, **options)
     else:
-        # For production, use pywebview
+        # For production, use pywebview on top of the pooled server
+        import webview
+        server = serve_in_background(app, port=0, **options)
         window = webview.create_window(
             "GLFS - Minecraft Bedrock Shader Loader", 
-            app, 
+            f"http://127.0.0.1:{server.server_port}", 
             width=900, 
             height=650, 
             min_size=(900, 650),
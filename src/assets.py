@@ -0,0 +1,143 @@
+"""Fingerprinted, precompressed static assets.
+
+    python -m src.assets [STATIC_DIR]
+
+copies every asset under static/js and static/css to static/dist with a
+content hash in its name (css/style.3f2a9c1e0b.css) plus a gzip variant
+beside it, and writes static/dist/manifest.json mapping the source paths
+to them. Templates link assets through asset_url(), so the hashed names
+change whenever the content does and can be cached forever.
+"""
+import os
+import sys
+import gzip
+import json
+import hashlib
+import threading
+
+from src.config_store import write_json_atomic
+
+ASSET_DIRS = ('js', 'css')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Hex digits of the content hash kept in file names
+HASH_LENGTH = 10
+
+# Variants smaller than this fraction of the original are kept
+MIN_GZIP_RATIO = 0.9
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprinted_name(rel, digest):
+    """css/style.css -> css/style.<hash>.css"""
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def build_assets(static_dir):
+    """Write hashed and gzipped copies of the assets; returns the manifest"""
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    assets = {}
+    for asset_dir in ASSET_DIRS:
+        for directory, _, names in os.walk(os.path.join(static_dir, asset_dir)):
+            for name in sorted(names):
+                source = os.path.join(directory, name)
+                rel = os.path.relpath(source, static_dir).replace(os.sep, '/')
+                digest = _sha256(source)
+                hashed = fingerprinted_name(rel, digest)
+                target = os.path.join(dist_dir, *hashed.split('/'))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(source, 'rb') as f:
+                    data = f.read()
+                with open(target, 'wb') as f:
+                    f.write(data)
+                # mtime=0 keeps the gzip output identical between builds
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) < len(data) * MIN_GZIP_RATIO:
+                    with open(target + '.gz', 'wb') as f:
+                        f.write(compressed)
+                elif os.path.exists(target + '.gz'):
+                    os.remove(target + '.gz')
+                assets[rel] = {"path": f"{DIST_DIR}/{hashed}", "sha256": digest, "size": len(data)}
+
+    manifest = {"assets": assets}
+    os.makedirs(dist_dir, exist_ok=True)
+    write_json_atomic(os.path.join(dist_dir, MANIFEST_NAME), manifest)
+    _prune(dist_dir, {entry["path"][len(DIST_DIR) + 1:] for entry in assets.values()})
+    return manifest
+
+
+def _prune(dist_dir, keep):
+    """Remove hashed files left over from earlier builds"""
+    for directory, _, names in os.walk(dist_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(directory, name), dist_dir).replace(os.sep, '/')
+            if rel == MANIFEST_NAME or rel in keep or (rel.endswith('.gz') and rel[:-3] in keep):
+                continue
+            os.remove(os.path.join(directory, name))
+
+
+class AssetManifest:
+    """Resolve asset paths to their fingerprinted URLs.
+
+    An entry is only used while its source file still has the hash it was
+    built from, so editing static/ without rebuilding falls back to the
+    plain, revalidated URL instead of serving a stale build. Sources are
+    re-hashed only when their size or mtime changes.
+    """
+
+    def __init__(self, static_dir, url_prefix='/static/'):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self._assets = None
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.static_dir, DIST_DIR, MANIFEST_NAME), 'r') as f:
+                return json.load(f).get("assets", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _current(self, rel, entry):
+        source = os.path.join(self.static_dir, *rel.split('/'))
+        try:
+            st = os.stat(source)
+        except OSError:
+            return False
+        key = (st.st_size, st.st_mtime_ns)
+        checked = self._checked.get(rel)
+        if checked is None or checked[0] != key:
+            fresh = st.st_size == entry["size"] and _sha256(source) == entry["sha256"]
+            checked = self._checked[rel] = (key, fresh)
+        return checked[1]
+
+    def url(self, rel):
+        with self._lock:
+            if self._assets is None:
+                self._assets = self._load()
+            entry = self._assets.get(rel)
+            if entry is not None and self._current(rel, entry):
+                return self.url_prefix + entry["path"]
+        return self.url_prefix + rel
+
+
+def is_fingerprinted(path):
+    """Check whether a static path points into the hashed build output"""
+    return path.startswith(DIST_DIR + '/') and not path.endswith(MANIFEST_NAME)
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+    for rel, entry in build_assets(root)["assets"].items():
+        print(f"{rel} -> {entry['path']}")
@@ -0,0 +1,320 @@
+import os
+import sys
+import shutil
+import json
+import time
+import hashlib
+
+from src.activation import activate_file
+from src.config_store import write_json_atomic
+
+# Read/write size used when streaming files through the store
+CHUNK_SIZE = 1024 * 1024
+
+# Name of the store directory inside a shader library
+STORE_DIR_NAME = '.glfs_store'
+
+# Folder inside the store holding interrupted imports
+PARTIAL_DIR_NAME = '.partial'
+
+# Suffix of the sidecar recording a blob's mtime when it was stored
+STAMP_SUFFIX = '.stamp'
+
+# Read size of imports; large reads keep slow USB and network drives streaming
+IMPORT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bytes copied between durable resume points
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+# Seconds after which gc drops an interrupted import that was never resumed
+PARTIAL_MAX_AGE = 3 * 24 * 60 * 60
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE, progress=None):
+    """Compute the SHA-256 of a file in a single streaming pass"""
+    digest = hashlib.sha256()
+    done = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Content-addressed file store, laid out as <root>/<size>/<sha256>"""
+
+    def __init__(self, root):
+        self.root = root
+
+    @classmethod
+    def for_library(cls, shaders_path):
+        """Get the store kept inside a shader library, so hardlinks stay on one volume"""
+        return cls(os.path.join(shaders_path, STORE_DIR_NAME))
+
+    def blob_path(self, digest, size):
+        return os.path.join(self.root, str(size), digest)
+
+    def _has_size(self, size):
+        """Check whether any blob of this size is stored"""
+        try:
+            with os.scandir(os.path.join(self.root, str(size))) as it:
+                return any(not entry.name.startswith('.tmp-') and not entry.name.endswith(STAMP_SUFFIX)
+                           for entry in it)
+        except OSError:
+            return False
+
+    def _stamp(self, blob):
+        """Record the mtime a blob has while it holds the content it is named after"""
+        write_json_atomic(blob + STAMP_SUFFIX, {"mtime_ns": os.stat(blob).st_mtime_ns})
+
+    def _remove_blob(self, blob):
+        os.remove(blob)
+        if os.path.exists(blob + STAMP_SUFFIX):
+            os.remove(blob + STAMP_SUFFIX)
+
+    def _intact(self, blob, size):
+        """Check that a stored blob still holds the content it is named after.
+
+        Library entries are hardlinks to their blob, so a library file edited
+        in place edits the blob too. A blob whose size or mtime differs from
+        its stamp is re-hashed, and dropped from the store when its content
+        changed; the edited library file keeps its own link.
+        """
+        try:
+            st = os.stat(blob)
+        except OSError:
+            return False
+        if st.st_size == size:
+            try:
+                with open(blob + STAMP_SUFFIX, 'r') as f:
+                    if int(json.load(f)["mtime_ns"]) == st.st_mtime_ns:
+                        return True
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            if hash_file(blob, IMPORT_CHUNK_SIZE) == os.path.basename(blob):
+                self._stamp(blob)
+                return True
+        print(f"Dropping {blob} from the store: it was modified after it was stored", file=sys.stderr)
+        self._remove_blob(blob)
+        return False
+
+    def partial_paths(self, src_path, st):
+        """Get the (.partial file, offset sidecar) an import of this exact source writes to"""
+        key = hashlib.sha1(json.dumps([os.path.normcase(os.path.abspath(src_path)), st.st_size,
+                                       st.st_mtime_ns]).encode('utf-8')).hexdigest()[:16]
+        base = os.path.join(self.root, PARTIAL_DIR_NAME, key)
+        return base + '.partial', base + '.offset'
+
+    def _resumable(self, sidecar):
+        """Check whether the source an offset sidecar was written for is unchanged"""
+        try:
+            with open(sidecar, 'r') as f:
+                src_path = json.load(f)["source"]
+            return self.partial_paths(src_path, os.stat(src_path))[1] == sidecar
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def _resume_offset(self, partial, sidecar, size):
+        """Get how much of a previous attempt can be kept, trimming the partial file to it"""
+        try:
+            with open(sidecar, 'r') as f:
+                offset = int(json.load(f)["offset"])
+            if not 0 < offset <= min(size, os.path.getsize(partial)):
+                return 0
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+        with open(partial, 'r+b') as f:
+            f.truncate(offset)
+        return offset
+
+    def _checkpoint(self, f, sidecar, offset, src_path):
+        """Make the first offset bytes of the partial file durable and record them"""
+        f.flush()
+        os.fsync(f.fileno())
+        write_json_atomic(sidecar, {"offset": offset, "source": os.path.abspath(src_path)})
+
+    def add(self, src_path, progress=None):
+        """Add a file to the store without writing content it already holds.
+
+        When a blob of the same size exists, the source is hashed first and
+        nothing is written if its blob is already stored, so re-importing
+        stored content costs one read. New content is copied in large chunks
+        into a .partial file while it is hashed. A sidecar records how much
+        of the partial file is durable; when a copy fails or is cancelled,
+        the next import of the same, unchanged source re-hashes that prefix
+        locally and resumes reading the source from there. Completed copies
+        are fsynced and renamed into place. progress(done_bytes,
+        total_bytes) is called after each chunk.
+
+        Returns (digest, blob_path, existed, stats) where stats holds the
+        bytes copied, the offset resumed from, the seconds taken and the
+        throughput in bytes per second.
+        """
+        start = time.perf_counter()
+        st = os.stat(src_path)
+        size = st.st_size
+        partial, sidecar = self.partial_paths(src_path, st)
+        if not os.path.exists(partial) and self._has_size(size):
+            digest = hash_file(src_path, IMPORT_CHUNK_SIZE,
+                               progress=(lambda done: progress(done, size)) if progress else None)
+            blob = self.blob_path(digest, size)
+            if self._intact(blob, size):
+                seconds = time.perf_counter() - start
+                stats = {"bytes": 0, "resumed_from": 0, "seconds": seconds, "throughput": None}
+                return digest, blob, True, stats
+        os.makedirs(os.path.dirname(partial), exist_ok=True)
+
+        digest = hashlib.sha256()
+        resumed = self._resume_offset(partial, sidecar, size) if os.path.exists(partial) else 0
+        if resumed:
+            with open(partial, 'rb') as f:
+                for chunk in iter(lambda: f.read(IMPORT_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        done = resumed
+        if progress:
+            progress(done, size)
+
+        with open(src_path, 'rb') as fsrc, open(partial, 'ab' if resumed else 'wb') as fdst:
+            fsrc.seek(resumed)
+            checkpointed = done
+            try:
+                while True:
+                    chunk = fsrc.read(IMPORT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    fdst.write(chunk)
+                    done += len(chunk)
+                    if done - checkpointed >= CHECKPOINT_BYTES:
+                        self._checkpoint(fdst, sidecar, done, src_path)
+                        checkpointed = done
+                    if progress:
+                        progress(done, size)
+            except BaseException:
+                # Keep what was copied so the next attempt resumes from here
+                if done > checkpointed:
+                    try:
+                        self._checkpoint(fdst, sidecar, done, src_path)
+                    except OSError as e:
+                        print(f"Failed to save import progress of {src_path}: {e}", file=sys.stderr)
+                raise
+            fdst.flush()
+            os.fsync(fdst.fileno())
+
+        if done != size:
+            os.remove(partial)
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            raise OSError(f"{src_path} changed size while it was imported")
+
+        shutil.copystat(src_path, partial)
+        digest = digest.hexdigest()
+        blob = self.blob_path(digest, size)
+        existed = self._intact(blob, size)
+        if existed:
+            os.remove(partial)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(partial, blob)
+            self._stamp(blob)
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+
+        seconds = time.perf_counter() - start
+        copied = size - resumed
+        stats = {
+            "bytes": copied,
+            "resumed_from": resumed,
+            "seconds": seconds,
+            "throughput": copied / seconds if seconds > 0 else None
+        }
+        return digest, blob, existed, stats
+
+    def import_file(self, src_path, dest_path, progress=None):
+        """Import a file into the store and expose it at dest_path"""
+        digest, blob, existed, stats = self.add(src_path, progress=progress)
+        method = activate_file(blob, dest_path)
+        return {
+            "hash": digest,
+            "blob": blob,
+            "deduplicated": existed,
+            "method": method,
+            **stats
+        }
+
+    def _gc_partials(self, max_age):
+        """Remove interrupted imports that can no longer be resumed or were abandoned"""
+        freed = 0
+        partial_dir = os.path.join(self.root, PARTIAL_DIR_NAME)
+        try:
+            entries = list(os.scandir(partial_dir))
+        except OSError:
+            return freed
+        groups = {}
+        for entry in entries:
+            key, ext = os.path.splitext(entry.name)
+            if ext in ('.partial', '.offset'):
+                groups.setdefault(key, []).append(entry)
+        cutoff = time.time() - max_age
+        for key, group in groups.items():
+            sidecar = os.path.join(partial_dir, key + '.offset')
+            try:
+                newest = max(entry.stat().st_mtime for entry in group)
+            except OSError:
+                continue
+            if os.path.exists(sidecar):
+                # The source changed or vanished, so no import will ever resume this one
+                stale = not self._resumable(sidecar) or newest < cutoff
+            else:
+                stale = newest < cutoff
+            if not stale:
+                continue
+            for entry in group:
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    freed += size
+                except OSError:
+                    pass
+        return freed
+
+    def gc(self, partial_max_age=PARTIAL_MAX_AGE):
+        """Remove blobs no longer linked from any library entry.
+
+        Interrupted imports are removed too when their source changed or
+        vanished, or when they were not resumed for partial_max_age seconds.
+
+        Returns the number of bytes freed.
+        """
+        freed = 0
+        if not os.path.isdir(self.root):
+            return freed
+        freed += self._gc_partials(partial_max_age)
+        for size_entry in os.scandir(self.root):
+            if not size_entry.is_dir() or size_entry.name == PARTIAL_DIR_NAME:
+                continue
+            for blob in os.scandir(size_entry.path):
+                if blob.name.startswith('.tmp-'):
+                    continue
+                if blob.name.endswith(STAMP_SUFFIX):
+                    if not os.path.exists(blob.path[:-len(STAMP_SUFFIX)]):
+                        try:
+                            os.remove(blob.path)
+                        except FileNotFoundError:
+                            pass
+                    continue
+                st = blob.stat()
+                if st.st_nlink <= 1:
+                    self._remove_blob(blob.path)
+                    freed += st.st_size
+            try:
+                os.rmdir(size_entry.path)
+            except OSError:
+                pass
+        return freed
@@ -0,0 +1,256 @@
+"""Headless command line interface to the shader library.
+
+    glfs list [--sort name|size|modified] [-q TEXT] [--offset N] [--limit N] [--refresh]
+    glfs import FILE_OR_GLOB...
+    glfs apply SHADER... [--launch]
+    glfs preset list | save NAME SHADER | apply NAME [--launch] | delete NAME
+    glfs diff OLD NEW
+    glfs verify [--refresh]
+    glfs snapshot list | create [--label TEXT] | restore ID [--dest DIR] | delete ID
+    glfs gc
+    glfs serve [--host HOST] [--port PORT] [--workers N]
+
+Every command prints one JSON document and exits non-zero if anything
+failed. The core is only imported once a command runs, so --help and
+argument errors stay instant.
+"""
+import os
+import sys
+import json
+import glob
+import argparse
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns (Windows shells do not), keeping literal paths as given"""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            paths.extend(matches or [pattern])
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def resolve_shader(core, name):
+    """Resolve a shader given as a path or as a file name in the library"""
+    if os.path.exists(name):
+        return os.path.abspath(name)
+    shaders_path = core.load_config().get("shaders_path")
+    if shaders_path:
+        candidate = os.path.join(shaders_path, name)
+        if os.path.exists(candidate):
+            return candidate
+    return name
+
+
+def summarize(results):
+    """Wrap per-item results in an overall status"""
+    failed = sum(1 for result in results if result.get("status") != "ok")
+    return {"status": "error" if failed else "ok", "failed": failed, "results": results}
+
+
+def cmd_list(core, args):
+    config = core.load_config()
+    total, shaders, _ = core.query_shaders(config.get("shaders_path"), sort=args.sort, q=args.q,
+                                           offset=args.offset, limit=args.limit, refresh=args.refresh)
+    return {"status": "ok", "total": total, "shaders": shaders}
+
+
+def cmd_import(core, args):
+    shaders_path = core.load_config().get("shaders_path")
+    if not shaders_path or not os.path.isdir(shaders_path):
+        return {"status": "error", "message": "Shaders path not set or invalid"}
+    results = []
+    for path in expand_inputs(args.files):
+        if not os.path.isfile(path):
+            result = {"status": "error", "message": "Shader file not found"}
+        else:
+            result = core.import_shader_file(os.path.abspath(path), shaders_path)
+        result["path"] = path
+        results.append(result)
+    return summarize(results)
+
+
+def apply_all(core, names, launch):
+    results = []
+    for name in names:
+        result = core.apply_shader(resolve_shader(core, name))
+        result["path"] = name
+        results.append(result)
+    summary = summarize(results)
+    if launch and summary["status"] == "ok":
+        summary["launch"] = core.launch_minecraft()
+    return summary
+
+
+def cmd_apply(core, args):
+    return apply_all(core, expand_inputs(args.shaders), args.launch)
+
+
+def cmd_preset(core, args):
+    if args.action == "list":
+        return {"status": "ok", "presets": core.load_config().get("presets", {})}
+    if args.action == "save":
+        # The process exits right away, so the pack is staged on first apply instead
+        return core.save_preset(args.name, args.shader, warm=False)
+    if args.action == "delete":
+        return core.delete_preset(args.name)
+    result = core.apply_preset(args.name)
+    if args.launch and result["status"] == "ok":
+        result["launch"] = core.launch_minecraft()
+    return result
+
+
+def cmd_diff(core, args):
+    from src.material_diff import diff_paths
+    try:
+        return {"status": "ok", "diff": diff_paths(args.old, args.new, core.section_cache)}
+    except (OSError, ValueError) as e:
+        return {"status": "error", "message": f"Error comparing shaders: {str(e)}"}
+
+
+def cmd_verify(core, args):
+    result = core.verify_library(refresh=args.refresh)
+    if result["status"] != "ok":
+        return result
+    shaders_path = core.load_config().get("shaders_path")
+    failed = []
+    for entry in core.get_shaders(shaders_path):
+        verdict = core.pack_verifier.status(entry)
+        if verdict["status"] == "failed":
+            failed.append({"path": entry["path"], "errors": verdict["errors"]})
+    return {"status": "error" if failed else "ok", "counts": result["counts"], "failed": failed}
+
+
+def cmd_snapshot(core, args):
+    from src.snapshots import SnapshotError
+    store = core.get_snapshot_store()
+    if args.action == "list":
+        return {"status": "ok", "snapshots": store.list()}
+    if args.action == "create":
+        return core.snapshot_game_materials(args.label)
+    if args.action == "delete":
+        try:
+            store.delete(args.id)
+        except SnapshotError as e:
+            return {"status": "error", "message": str(e)}
+        return {"status": "ok", "message": f"Snapshot {args.id} deleted"}
+    if args.dest:
+        try:
+            return {"status": "ok", **store.restore(args.id, args.dest)}
+        except SnapshotError as e:
+            return {"status": "error", "message": str(e)}
+    return core.restore_game_materials(args.id)
+
+
+def cmd_gc(core, args):
+    from src.blob_store import BlobStore
+    shaders_path = core.load_config().get("shaders_path")
+    freed = {"snapshots": core.get_snapshot_store().gc()}
+    if shaders_path and os.path.isdir(shaders_path):
+        freed["library"] = BlobStore.for_library(shaders_path).gc()
+    return {"status": "ok", "freed": freed}
+
+
+def cmd_serve(core, args):
+    from src.app import app
+    from src.server import serve, server_options
+    options = server_options(core.load_config())
+    if args.workers:
+        options["workers"] = args.workers
+    serve(app, host=args.host, port=args.port, **options)
+    return {"status": "ok", "message": "Server stopped"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="glfs", description="Manage Minecraft Bedrock shaders without the GUI")
+    parser.add_argument("--indent", type=int, default=None, help="indent the JSON output")
+    parser.add_argument("--config", help="configuration file to use instead of the application's config.json")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    sub = commands.add_parser("list", help="list the shader library")
+    sub.add_argument("--sort", default="name", choices=("name", "-name", "size", "-size", "modified", "-modified"))
+    sub.add_argument("-q", default="", help="only shaders whose name contains this text")
+    sub.add_argument("--offset", type=int, default=0)
+    sub.add_argument("--limit", type=int, default=None)
+    sub.add_argument("--refresh", action="store_true", help="rescan the library even if it looks unchanged")
+    sub.set_defaults(func=cmd_list)
+
+    sub = commands.add_parser("import", help="import shader files or globs into the library")
+    sub.add_argument("files", nargs="+")
+    sub.set_defaults(func=cmd_import)
+
+    sub = commands.add_parser("apply", help="apply shaders by path or library name")
+    sub.add_argument("shaders", nargs="+")
+    sub.add_argument("--launch", action="store_true", help="launch Minecraft once everything is applied")
+    sub.set_defaults(func=cmd_apply)
+
+    sub = commands.add_parser("preset", help="list, save, apply or delete presets")
+    presets = sub.add_subparsers(dest="action", metavar="ACTION")
+    presets.required = True
+    presets.add_parser("list")
+    action = presets.add_parser("save")
+    action.add_argument("name")
+    action.add_argument("shader")
+    action = presets.add_parser("apply")
+    action.add_argument("name")
+    action.add_argument("--launch", action="store_true", help="launch Minecraft after applying")
+    action = presets.add_parser("delete")
+    action.add_argument("name")
+    sub.set_defaults(func=cmd_preset)
+
+    sub = commands.add_parser("diff", help="structurally compare two material.bin files or packs")
+    sub.add_argument("old")
+    sub.add_argument("new")
+    sub.set_defaults(func=cmd_diff)
+
+    sub = commands.add_parser("verify", help="check library packs for damaged archives, manifests and materials")
+    sub.add_argument("--refresh", action="store_true", help="rescan the library even if it looks unchanged")
+    sub.set_defaults(func=cmd_verify)
+
+    sub = commands.add_parser("snapshot", help="back up or restore the game's original materials")
+    snapshots = sub.add_subparsers(dest="action", metavar="ACTION")
+    snapshots.required = True
+    snapshots.add_parser("list")
+    action = snapshots.add_parser("create")
+    action.add_argument("--label", help="e.g. the game version")
+    action = snapshots.add_parser("restore")
+    action.add_argument("id")
+    action.add_argument("--dest", help="restore into this folder instead of the game")
+    action = snapshots.add_parser("delete")
+    action.add_argument("id")
+    sub.set_defaults(func=cmd_snapshot)
+
+    sub = commands.add_parser("serve", help="serve the web interface and API without a window")
+    sub.add_argument("--host", default="127.0.0.1")
+    sub.add_argument("--port", type=int, default=5000)
+    sub.add_argument("--workers", type=int, help="request worker threads (default from the config)")
+    sub.set_defaults(func=cmd_serve)
+
+    sub = commands.add_parser("gc", help="remove store blobs, abandoned imports and snapshot chunks nothing uses")
+    sub.set_defaults(func=cmd_gc)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config:
+        os.environ['GLFS_CONFIG'] = os.path.abspath(args.config)
+    from src import core
+    try:
+        result = args.func(core, args)
+    except ValueError as e:
+        result = {"status": "error", "message": str(e)}
+    finally:
+        core.config_store.flush()
+    print(json.dumps(result, indent=args.indent))
+    return 0 if result.get("status") == "ok" else 1
+
+
+if __name__ == "__main__":
+    # Add the project root to the Python path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import os
+import sys
+import copy
+import json
+import time
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file beside path and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _try_lock(fd):
+    if os.name == 'nt':
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(fd):
+    if os.name == 'nt':
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path, timeout=10.0, poll=0.05):
+    """Hold an exclusive lock on a lock file, shared with other processes and threads.
+
+    A timeout of None waits for as long as the lock is held.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                _try_lock(fd)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {path}")
+                time.sleep(poll)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+class ConfigStore:
+    """Parsed configuration kept in memory, persisted with debounced atomic writes.
+
+    Reads are served from memory. The file's mtime is checked at most once
+    per check_interval so external edits are still picked up. Saves update
+    memory immediately and are written to disk after a short debounce,
+    coalescing bursts of saves into one write.
+    """
+
+    def __init__(self, path, defaults, debounce=0.25, check_interval=1.0):
+        self.path = path
+        self.defaults = defaults
+        self.debounce = debounce
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._config = None
+        self._mtime = None
+        self._checked = 0.0
+        self._dirty = False
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self):
+        """Parse the config file, falling back to the defaults"""
+        config = copy.deepcopy(self.defaults)
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    config.update(json.load(f))
+            except Exception as e:
+                print(f"Failed to load configuration: {e}", file=sys.stderr)
+        return config
+
+    def load(self):
+        """Get a copy of the current configuration"""
+        with self._lock:
+            now = time.monotonic()
+            if self._config is None or (not self._dirty and now - self._checked >= self.check_interval):
+                self._checked = now
+                mtime = self._file_mtime()
+                if self._config is None or mtime != self._mtime:
+                    self._config = self._read()
+                    self._mtime = mtime
+            return copy.deepcopy(self._config)
+
+    def save(self, config):
+        """Replace the configuration and schedule it to be written"""
+        with self._lock:
+            self._config = copy.deepcopy(config)
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return True
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            try:
+                write_json_atomic(self.path, self._config)
+                self._mtime = self._file_mtime()
+                self._dirty = False
+                return True
+            except Exception as e:
+                print(f"Failed to save configuration: {e}", file=sys.stderr)
+                return False
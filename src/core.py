@@ -0,0 +1,580 @@
+"""Shader library core shared by the Flask app, the desktop shells and the CLI.
+
+Nothing here imports Flask or a GUI toolkit; platform specifics come from
+src.platforms, which loads its backend on first use.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import sqlite3
+import subprocess
+import uuid
+from src.shader_index import ShaderIndex
+from src.blob_store import BlobStore
+from src.activation import activate_file
+from src.config_store import ConfigStore
+from src.mcpack_meta import read_pack_manifest, parse_manifest
+from src.material_bin import read_material_summary
+from src.material_diff import SectionCache
+from src.preset_slots import ACTIVE_PACK_DIR, slots_for
+from src.global_packs import GlobalPackStack, read_pack_header
+from src.pack_verify import PackVerifier
+from src.uuid_index import PackUuidIndex, manifest_uuids, read_pack_uuids
+from src.snapshots import SnapshotStore
+from src.thumbnails import ThumbnailCache, read_icon_info
+from src.watcher import DirectoryWatcher, EventHub
+from src.jobs import JobManager, JobCancelled, JobQueueFull
+from src.platforms import get_platform
+from src import metrics
+
+# Get the base directory for the application
+if getattr(sys, 'frozen', False):
+    # If the application is run as a bundle (compiled with PyInstaller)
+    base_dir = sys._MEIPASS
+else:
+    # If the application is run from a Python interpreter
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Configuration file path, overridable for scripted use
+config_path = os.environ.get('GLFS_CONFIG') or os.path.join(base_dir, 'config.json')
+
+# Application data directory for caches and indexes
+data_dir = os.environ.get('GLFS_DATA_DIR') or get_platform().data_dir()
+
+# Persistent shader library index
+shader_index = ShaderIndex(os.path.join(data_dir, 'shader_index.db'))
+shader_index.register_extractor('manifest', ('.mcpack',), read_pack_manifest)
+shader_index.register_extractor('material', ('.bin',), read_material_summary)
+shader_index.register_extractor('icon', ('.mcpack',), read_icon_info)
+
+# Pack icon thumbnails by icon id, and the packs they come from
+thumbnail_cache = ThumbnailCache(os.path.join(data_dir, 'thumbnails'))
+icon_sources = {}
+
+# Integrity verdicts of library files, by content hash
+pack_verifier = PackVerifier(os.path.join(data_dir, 'pack_verify.db'))
+verify_job = None
+
+# Header and module UUIDs of installed resource packs
+pack_uuid_index = PackUuidIndex(os.path.join(data_dir, 'pack_uuids.db'))
+
+# Section hashes of compared materials, so unchanged sections are not re-read
+section_cache = SectionCache(os.path.join(data_dir, 'section_cache.db'))
+
+# Snapshots of the game's original materials, created on first use
+snapshot_store = None
+snapshot_store_lock = threading.Lock()
+
+# Background jobs for imports, applies and installs
+jobs = JobManager(max_workers=4)
+
+# Live library change notifications
+shader_events = EventHub()
+shader_watcher = None
+shader_watcher_lock = threading.Lock()
+
+# Configuration
+DEFAULT_CONFIG = {
+    "minecraft_path": "",
+    "shaders_path": "",
+    "brd_path": "",
+    "theme": "dark",
+    "last_used_shader": "",
+    "presets": {},
+    "preset_slots": 3,
+    "preset_slot_budget_mb": 2048,
+    "snapshot_codec": "zlib",
+    "server_workers": 8,
+    "server_queue_size": 64,
+    "server_keepalive_timeout": 15,
+    "server_max_streams": 16
+}
+
+# In-memory configuration with write-behind persistence
+config_store = ConfigStore(config_path, DEFAULT_CONFIG)
+
+def load_config():
+    """Load configuration"""
+    with metrics.span("config_load"):
+        return config_store.load()
+
+def save_config(config):
+    """Save configuration"""
+    return config_store.save(config)
+
+def detect_minecraft_path():
+    """Auto-detect Minecraft Bedrock installation path"""
+    return get_platform().detect_install_path()
+
+def set_default_shaders_path(minecraft_path):
+    """Set default shaders path inside Minecraft directory"""
+    shaders_path = os.path.join(minecraft_path, "renderer", "materials")
+    os.makedirs(shaders_path, exist_ok=True)
+    return shaders_path
+
+def check_material_bin_loader(brd_path):
+    """Check if MaterialBinLoader is installed and working."""
+    try:
+        config = load_config()
+        mc_path = config.get('minecraft_path')
+        if not mc_path:
+            return {"status": "error", "message": "Minecraft path not set"}
+
+        # Check for MaterialBinLoader in the right directory
+        mbl_path = os.path.join(mc_path, "data", "renderer", "materials", "MaterialBinLoader.js")
+        if not os.path.exists(mbl_path):
+            return {"status": "missing", "message": "MaterialBinLoader not installed"}
+
+        return {"status": "ok", "message": "MaterialBinLoader is installed"}
+        
+    except Exception as e:
+        return {"status": "error", "message": f"Error checking MaterialBinLoader status: {str(e)}"}
+
+def install_material_bin_loader(brd_path, job=None):
+    """Install or fix MaterialBinLoader"""
+    if not brd_path:
+        return {"status": "error", "message": "BetterRenderDragon path not set"}
+    
+    brd_exe = os.path.join(brd_path, "BetterRenderDragon.exe")
+    if not os.path.exists(brd_exe):
+        return {"status": "error", "message": "BetterRenderDragon.exe not found"}
+
+    try:
+        with metrics.span("mbl_install_subprocess"):
+            process = subprocess.Popen([brd_exe, "--install"], stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, text=True)
+            while True:
+                try:
+                    _, stderr = process.communicate(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if job is not None and job.cancelled:
+                        process.kill()
+                        process.communicate()
+                        raise JobCancelled()
+        if process.returncode == 0:
+            return {"status": "ok", "message": "MaterialBinLoader installed successfully"}
+        else:
+            return {"status": "error", "message": f"Installation failed: {stderr}"}
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": f"Error installing MaterialBinLoader: {str(e)}"}
+
+def get_shaders(shaders_path, refresh=False):
+    """Get list of available shaders from the library index"""
+    if not shaders_path or not os.path.isdir(shaders_path):
+        return []
+    with metrics.span("directory_scan"):
+        return shader_index.scan(shaders_path, force=refresh)
+
+def get_resource_packs_dir():
+    """Get Minecraft's resource_packs directory"""
+    return get_platform().resource_packs_dir()
+
+def query_shaders(shaders_path, sort='name', q='', offset=0, limit=None, refresh=False):
+    """Get (total, page, etag) for a sorted, filtered page of the library"""
+    if not shaders_path or not os.path.isdir(shaders_path):
+        total, shaders = 0, []
+    else:
+        with metrics.span("directory_scan"):
+            total, shaders = shader_index.query(shaders_path, sort=sort, q=q, offset=offset,
+                                                limit=limit, force=refresh)
+    # The library generation changes whenever any indexed entry does
+    etag = hashlib.sha1(json.dumps([
+        shader_index.instance, shader_index.generation, pack_verifier.generation,
+        shaders_path, sort, q, offset, limit
+    ]).encode()).hexdigest()
+    shaders = [dict(entry, verify=pack_verifier.status(entry)) for entry in shaders]
+    return total, shaders, etag
+
+def verify_library(refresh=False, job=None):
+    """Verify every library file not verified in its current state."""
+    shaders_path = load_config().get("shaders_path")
+    if not shaders_path or not os.path.isdir(shaders_path):
+        return {"status": "error", "message": "Shaders path not set or invalid"}
+    entries = get_shaders(shaders_path, refresh=refresh)
+    with metrics.span("verify_library"):
+        counts = pack_verifier.verify(entries, progress=job.update if job else None)
+    return {"status": "ok", "message": "Library verified", "counts": counts}
+
+def ensure_library_verified(entries):
+    """Start a background verification if any listed file has no verdict yet."""
+    global verify_job
+    if verify_job is not None and verify_job.finished is None:
+        return verify_job
+    if not pack_verifier.stale(entries):
+        return None
+    try:
+        verify_job = jobs.submit('verify', lambda job: verify_library(job=job), target='verify')
+    except JobQueueFull:
+        return None
+    return verify_job
+
+def prefetch_icons(entries):
+    """Queue thumbnails for listed packs so they are ready when the list asks."""
+    for entry in entries:
+        icon = entry.get("icon")
+        if icon:
+            icon_sources[icon["id"]] = entry["path"]
+            thumbnail_cache.request(icon["id"], entry["path"])
+
+def get_icon_thumbnail(icon_id, timeout=10):
+    """Get the path of a pack icon thumbnail, generating it if needed; None if unknown."""
+    path = thumbnail_cache.get(icon_id)
+    if path:
+        return path
+    if icon_id not in icon_sources:
+        for entry in get_shaders(load_config().get("shaders_path")):
+            if entry.get("icon"):
+                icon_sources[entry["icon"]["id"]] = entry["path"]
+    source = icon_sources.get(icon_id)
+    if source is None:
+        return None
+    future = thumbnail_cache.request(icon_id, source)
+    if future is not None:
+        future.result(timeout)
+    return thumbnail_cache.get(icon_id)
+
+def publish_shader_changes(deltas):
+    """Publish watcher deltas, attaching index entries for library files"""
+    shaders_path = load_config().get("shaders_path")
+    library = os.path.normpath(shaders_path) if shaders_path else None
+    entries = {}
+    if library and any(delta["dir"] == library for delta in deltas):
+        # In-place modifications leave the directory mtime alone, so force a rescan
+        force = any(delta["type"] == "modified" for delta in deltas)
+        entries = {entry["path"]: entry for entry in get_shaders(shaders_path, refresh=force)}
+    for delta in deltas:
+        delta["library"] = delta["dir"] == library
+        if delta["library"]:
+            if delta["type"] != "removed" and delta["path"] not in entries:
+                continue
+            entry = entries.get(delta["path"])
+            # Same shape as the /api/shaders rows the client patches
+            delta["entry"] = dict(entry, verify=pack_verifier.status(entry)) if entry else None
+        shader_events.publish(delta)
+
+def ensure_shader_watcher():
+    """Start the library watcher, or retarget it after the paths changed"""
+    global shader_watcher
+    config = load_config()
+    paths = [os.path.join(get_resource_packs_dir(), 'glfs_shaders')]
+    if config.get("shaders_path"):
+        paths.insert(0, config["shaders_path"])
+    paths = [os.path.normpath(path) for path in paths if os.path.isdir(path)]
+    with shader_watcher_lock:
+        if shader_watcher is not None and shader_watcher.paths == paths:
+            return
+        if shader_watcher is not None:
+            shader_watcher.stop()
+        shader_watcher = DirectoryWatcher(paths, publish_shader_changes)
+        shader_watcher.start()
+
+def retarget_shader_watcher():
+    """Point a running library watcher at the configured paths"""
+    if shader_watcher is not None:
+        ensure_shader_watcher()
+
+def shader_pack_manifest():
+    """Build the manifest of the GLFS Shaders resource pack with fresh UUIDs."""
+    return {
+        "format_version": 2,
+        "header": {
+            "description": "GLFS Shaders Resource Pack",
+            "name": "GLFS Shaders",
+            "uuid": str(uuid.uuid4()),
+            "version": [1, 0, 0],
+            "min_engine_version": [1, 19, 0]
+        },
+        "modules": [
+            {
+                "description": "GLFS Shaders Resources",
+                "type": "resources",
+                "uuid": str(uuid.uuid4()),
+                "version": [1, 0, 0]
+            }
+        ]
+    }
+
+def has_valid_uuids(manifest_path):
+    """Check that a pack manifest has a header UUID and that every UUID in it is well formed."""
+    try:
+        with open(manifest_path, 'rb') as f:
+            uuids = manifest_uuids(parse_manifest(f.read()))
+        for _, value in uuids:
+            uuid.UUID(value)
+    except (OSError, ValueError):
+        return False
+    return any(kind == "header" for kind, _ in uuids)
+
+def ensure_shader_directories():
+    """Create necessary shader directories if they don't exist."""
+    try:
+        # Create GLFS resource pack directory
+        resource_pack_dir = os.path.join(get_resource_packs_dir(), 'glfs_shaders')
+        manifest_path = os.path.join(resource_pack_dir, 'manifest.json')
+        os.makedirs(resource_pack_dir, exist_ok=True)
+        
+        # Older versions pasted a random suffix onto a fixed prefix, which is not a valid UUID
+        if not has_valid_uuids(manifest_path):
+            replaced = read_pack_header(resource_pack_dir)
+            with open(manifest_path, 'w') as f:
+                json.dump(shader_pack_manifest(), f, indent=4)
+            if replaced:
+                replace_global_pack(replaced[0], 'glfs_shaders')
+                
+        return {"status": "ok", "message": "Shader directories created"}
+    except Exception as e:
+        return {"status": "error", "message": f"Error creating shader directories: {str(e)}"}
+
+def find_pack_conflicts(uuids, exclude=()):
+    """Find installed packs that share any of these (kind, uuid) pairs, skipping the exclude folders."""
+    try:
+        pack_uuid_index.refresh(get_resource_packs_dir())
+        conflicts = pack_uuid_index.find_conflicts(uuids, exclude)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error checking resource pack UUIDs: {e}", file=sys.stderr)
+        return []
+    for conflict in conflicts:
+        print(f"UUID {conflict['uuid']} is also used by {', '.join(conflict['packs'])}", file=sys.stderr)
+    return conflicts
+
+def installed_pack_conflicts(pack_dir):
+    """Find other installed packs that share a UUID with an installed pack."""
+    try:
+        pack_uuid_index.refresh_pack(pack_dir)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error checking resource pack UUIDs: {e}", file=sys.stderr)
+        return []
+    return find_pack_conflicts(pack_uuid_index.pack_uuids(pack_dir), exclude=[pack_dir])
+
+def list_pack_conflicts():
+    """List every UUID shared by installed resource packs."""
+    pack_uuid_index.refresh(get_resource_packs_dir())
+    return pack_uuid_index.all_conflicts()
+
+def get_apply_target(shader_path):
+    """Get the directory an apply of this shader writes into."""
+    if shader_path.endswith('.mcpack'):
+        return os.path.join(get_resource_packs_dir(), ACTIVE_PACK_DIR)
+    return os.path.join(get_resource_packs_dir(), 'glfs_shaders', 'materials')
+
+def apply_shader(shader_path, job=None):
+    """Apply a shader by swapping it into the resource pack directory."""
+    try:
+        if not os.path.exists(shader_path):
+            return {"status": "error", "message": "Shader file not found"}
+            
+        verdict = pack_verifier.check(shader_path)
+        if verdict["status"] == "failed":
+            return {"status": "error", "message": f"Shader failed verification: {'; '.join(verdict['errors'][:3])}",
+                    "errors": verdict["errors"]}
+        
+        if shader_path.endswith('.mcpack'):
+            return install_shader_pack(shader_path, job)
+            
+        # Create materials directory if it doesn't exist
+        materials_dir = get_apply_target(shader_path)
+        if not os.path.exists(materials_dir):
+            os.makedirs(materials_dir)
+            
+        # Link the shader into the resource pack and swap it in atomically
+        shader_name = os.path.basename(shader_path)
+        dest_path = os.path.join(materials_dir, shader_name)
+        start = time.perf_counter()
+        activate_file(shader_path, dest_path)
+        metrics.record_copy("apply", os.path.getsize(dest_path), time.perf_counter() - start)
+        
+        config = load_config()
+        config["last_used_shader"] = shader_path
+        save_config(config)
+        
+        return {
+            "status": "ok",
+            "message": f"Shader {shader_name} applied successfully",
+            "enabled_globally": enable_global_packs(['glfs_shaders']),
+            "uuid_conflicts": installed_pack_conflicts(os.path.dirname(materials_dir))
+        }
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": f"Error applying shader: {str(e)}"}
+
+def get_preset_slots():
+    """Get the warm pack slots kept next to the active pack folder."""
+    config = load_config()
+    return slots_for(get_resource_packs_dir(), config.get("preset_slots", 3),
+                     config.get("preset_slot_budget_mb", 2048))
+
+def install_shader_pack(pack_path, job=None):
+    """Install an .mcpack into the active resource pack folder, through a warm slot."""
+    pack_name = os.path.basename(pack_path)
+    dest_dir = get_apply_target(pack_path)
+
+    os.makedirs(os.path.dirname(dest_dir), exist_ok=True)
+    # The pack being replaced may lose its slot to eviction, so remember its id for the pack stack
+    replaced = read_pack_header(dest_dir)
+    start = time.perf_counter()
+    result = get_preset_slots().activate(pack_path, progress=job.update if job else None)
+    metrics.record_copy("install_pack", result["bytes"], time.perf_counter() - start)
+
+    config = load_config()
+    config["last_used_shader"] = pack_path
+    save_config(config)
+
+    return {
+        "status": "ok",
+        "message": f"Shader pack {pack_name} installed successfully",
+        "mode": result["mode"],
+        "changed": result["files"],
+        "removed": result["removed"],
+        "enabled_globally": enable_global_packs([ACTIVE_PACK_DIR], [replaced[0]] if replaced else ()),
+        "uuid_conflicts": installed_pack_conflicts(dest_dir)
+    }
+
+def enable_global_packs(pack_dirs, replaced_ids=()):
+    """Enable installed packs in the game's global resource packs with one write; returns success."""
+    try:
+        with metrics.span("global_packs"):
+            result = GlobalPackStack.for_resource_packs(get_resource_packs_dir()).enable(pack_dirs, replaced_ids)
+    except (OSError, TimeoutError) as e:
+        print(f"Error enabling global resource packs: {e}", file=sys.stderr)
+        return False
+    if result["missing"]:
+        print(f"Packs without a readable manifest were not enabled: {', '.join(result['missing'])}", file=sys.stderr)
+    return not result["missing"]
+
+def replace_global_pack(old_pack_id, pack_dir):
+    """Drop a pack_id from the game's global resource packs, enabling pack_dir in its place if it was there."""
+    try:
+        stack = GlobalPackStack.for_resource_packs(get_resource_packs_dir())
+        if stack.disable([old_pack_id])["removed"]:
+            stack.enable([pack_dir])
+    except (OSError, TimeoutError) as e:
+        print(f"Error updating global resource packs: {e}", file=sys.stderr)
+
+def resolve_preset(name):
+    """Get the shader path a preset points at, or None if there is no such preset."""
+    config = load_config()
+    shader = config.get("presets", {}).get(name)
+    if not shader:
+        return None
+    # Presets saved by the desktop app hold a file name in the library
+    if not os.path.isabs(shader) and config.get("shaders_path"):
+        return os.path.join(config["shaders_path"], shader)
+    return shader
+
+def save_preset(name, shader, warm=True):
+    """Save a preset; .mcpack presets are staged into a warm slot in the background."""
+    if not name or not shader:
+        return {"status": "error", "message": "Preset name and shader name are required"}
+    config = load_config()
+    config.setdefault("presets", {})[name] = shader
+    save_config(config)
+    result = {"status": "ok", "message": f"Preset {name} saved"}
+    shader_path = resolve_preset(name)
+    if warm and shader_path.endswith('.mcpack') and os.path.isfile(shader_path):
+        try:
+            job = jobs.submit('prewarm', lambda job: get_preset_slots().stage(shader_path, progress=job.update),
+                              target=get_apply_target(shader_path))
+            result["job_id"] = job.id
+        except JobQueueFull:
+            pass
+    return result
+
+def delete_preset(name):
+    """Delete a preset."""
+    config = load_config()
+    if name not in config.get("presets", {}):
+        return {"status": "error", "message": f"Preset {name} not found"}
+    del config["presets"][name]
+    save_config(config)
+    return {"status": "ok", "message": f"Preset {name} deleted"}
+
+def apply_preset(name, job=None):
+    """Apply the shader a preset points at."""
+    shader_path = resolve_preset(name)
+    if shader_path is None:
+        return {"status": "error", "message": f"Preset {name} not found"}
+    result = apply_shader(shader_path, job)
+    result["preset"] = name
+    return result
+
+def import_shader_file(shader_path, shaders_path, job=None):
+    """Import a shader into the library through its content store."""
+    try:
+        # Add shader to the library's content store and link it into place
+        shader_name = os.path.basename(shader_path)
+        dest_path = os.path.join(shaders_path, shader_name)
+        result = BlobStore.for_library(shaders_path).import_file(
+            shader_path, dest_path, progress=job.update if job else None)
+        metrics.record_copy("import", result["bytes"], result["seconds"])
+        conflicts = find_pack_conflicts(read_pack_uuids(dest_path)) if dest_path.endswith('.mcpack') else []
+        return {
+            "status": "ok",
+            "message": f"Shader {shader_name} imported successfully",
+            "hash": result["hash"],
+            "deduplicated": result["deduplicated"],
+            "resumed_from": result["resumed_from"],
+            "throughput": result["throughput"],
+            "uuid_conflicts": conflicts
+        }
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": f"Error importing shader: {str(e)}"}
+
+def get_snapshot_store():
+    """Get the store holding snapshots of the game's original materials."""
+    global snapshot_store
+    codec = load_config().get("snapshot_codec", "zlib")
+    with snapshot_store_lock:
+        # One store per process, so its lock serializes snapshots with gc
+        if snapshot_store is None or snapshot_store.codec != codec:
+            snapshot_store = SnapshotStore(os.path.join(data_dir, 'snapshots'), codec=codec)
+        return snapshot_store
+
+def get_game_materials_dir():
+    """Get the game's own renderer/materials folder, or None if the game path is unset."""
+    mc_path = load_config().get('minecraft_path')
+    if not mc_path:
+        return None
+    return os.path.join(mc_path, "data", "renderer", "materials")
+
+def snapshot_game_materials(label=None, only_if_changed=False, job=None):
+    """Snapshot the game's original material.bin files."""
+    source = get_game_materials_dir()
+    if not source or not os.path.isdir(source):
+        return {"status": "error", "message": "Minecraft materials folder not found"}
+    store = get_snapshot_store()
+    try:
+        if only_if_changed and store.is_current(source):
+            return {"status": "ok", "message": "Materials unchanged since the last snapshot"}
+        snapshot = store.create(source, label=label, progress=job.update if job else None)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": f"Error creating snapshot: {str(e)}"}
+    return {"status": "ok", "message": f"Snapshot {snapshot['id']} created", "snapshot": snapshot}
+
+def restore_game_materials(snapshot_id, job=None):
+    """Restore the game's materials from a snapshot."""
+    try:
+        result = get_snapshot_store().restore(snapshot_id, progress=job.update if job else None)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": f"Error restoring snapshot: {str(e)}"}
+    return {"status": "ok", "message": f"Restored {result['files']} files from snapshot {snapshot_id}", **result}
+
+def launch_minecraft():
+    """Launch Minecraft using the launchminecraft.bat file."""
+    try:
+        config = load_config()
+        return get_platform().launch_minecraft(config.get('brd_path') or '')
+    except Exception as e:
+        return {'status': 'error', 'message': f'Failed to launch Minecraft: {str(e)}'}
@@ -0,0 +1,124 @@
+import os
+import sys
+
+from src.config_store import write_json_atomic, file_lock
+from src.mcpack_meta import MANIFEST_NAME, parse_manifest
+from src.preset_slots import SLOTS_DIR_NAME
+
+GLOBAL_PACKS_NAME = 'global_resource_packs.json'
+
+
+def read_pack_header(pack_dir):
+    """Get (pack_id, version) from an installed pack's manifest.json, or None"""
+    try:
+        with open(os.path.join(pack_dir, MANIFEST_NAME), 'rb') as f:
+            manifest = parse_manifest(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Failed to read manifest of {pack_dir}: {e}", file=sys.stderr)
+        return None
+    header = manifest.get("header", {}) if isinstance(manifest, dict) else {}
+    pack_id = header.get("uuid")
+    if not pack_id:
+        return None
+    return pack_id, list(header.get("version") or [1, 0, 0])
+
+
+class GlobalPackStack:
+    """Batched edits of the game's global resource pack stack.
+
+    global_resource_packs.json lists the globally enabled packs, top of the
+    stack first, by pack_id and version. enable() resolves a whole set of
+    installed pack folders, then rewrites the file once, atomically, under
+    a lock file so the web and standalone front-ends never interleave
+    their read-modify-write cycles. Packs parked in warm preset slots are
+    not visible to the game, so their entries are dropped on the way.
+    """
+
+    def __init__(self, path, resource_packs_dir):
+        self.path = path
+        self.resource_packs_dir = resource_packs_dir
+        self.lock_path = path + '.lock'
+
+    @classmethod
+    def for_resource_packs(cls, resource_packs_dir):
+        """Get the stack of the com.mojang folder a resource_packs directory is in"""
+        com_mojang = os.path.dirname(os.path.abspath(resource_packs_dir))
+        return cls(os.path.join(com_mojang, 'minecraftpe', GLOBAL_PACKS_NAME), resource_packs_dir)
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                entries = parse_manifest(f.read())
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"Failed to read {self.path}: {e}", file=sys.stderr)
+            return []
+        return [entry for entry in entries if isinstance(entry, dict)] if isinstance(entries, list) else []
+
+    def entries(self):
+        """Get the current stack, top first"""
+        return self._read()
+
+    def _slot_pack_ids(self):
+        ids = set()
+        slots_dir = os.path.join(self.resource_packs_dir, SLOTS_DIR_NAME)
+        if not os.path.isdir(slots_dir):
+            return ids
+        for entry in os.scandir(slots_dir):
+            if entry.is_dir() and '.glfs-' not in entry.name:
+                header = read_pack_header(entry.path)
+                if header:
+                    ids.add(header[0])
+        return ids
+
+    def enable(self, pack_dirs, replaced_ids=()):
+        """Put installed packs, given as folder names in resource_packs, on top of the stack in order.
+
+        replaced_ids are pack_ids that the new packs took the place of, for
+        example the pack that was in glfs_active before a switch. They are
+        removed even when their folder is already gone, such as a slot that
+        was evicted during the switch.
+        """
+        resolved = []
+        missing = []
+        for name in pack_dirs:
+            header = read_pack_header(os.path.join(self.resource_packs_dir, name))
+            if header is None:
+                missing.append(name)
+            else:
+                resolved.append({"dir": name, "pack_id": header[0], "version": header[1]})
+
+        enabled_ids = {pack["pack_id"] for pack in resolved}
+        parked_ids = (self._slot_pack_ids() | set(replaced_ids)) - enabled_ids
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with file_lock(self.lock_path):
+            current = self._read()
+            existing = {entry.get("pack_id"): entry for entry in current}
+            top = []
+            for pack in resolved:
+                # Keep fields such as subpack choices the game stored for this pack
+                entry = dict(existing.get(pack["pack_id"], {}))
+                entry.update({"pack_id": pack["pack_id"], "version": pack["version"]})
+                top.append(entry)
+            rest = [entry for entry in current
+                    if entry.get("pack_id") not in enabled_ids and entry.get("pack_id") not in parked_ids]
+            stack = top + rest
+            written = stack != current
+            if written:
+                write_json_atomic(self.path, stack)
+        return {"enabled": resolved, "missing": missing, "written": written}
+
+    def disable(self, pack_ids):
+        """Remove packs from the stack by pack_id"""
+        pack_ids = set(pack_ids)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with file_lock(self.lock_path):
+            current = self._read()
+            stack = [entry for entry in current if entry.get("pack_id") not in pack_ids]
+            written = stack != current
+            if written:
+                write_json_atomic(self.path, stack)
+        return {"removed": len(current) - len(stack), "written": written}
@@ -0,0 +1,168 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancellation has been requested"""
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting to run"""
+
+
+class Job:
+    """A long-running operation with progress, result and cancellation"""
+
+    def __init__(self, kind, target=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.target = target
+        self.status = "queued"
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Ask the job to stop at its next progress check"""
+        self._cancel.set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def update(self, done, total=None, message=None):
+        """Report progress; also the point where cancellation takes effect"""
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.check_cancelled()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+
+class JobManager:
+    """Run jobs on a bounded worker pool.
+
+    Jobs sharing a target (e.g. the pack directory an apply writes to) run
+    one at a time: the manager keeps a queue per target and hands the next
+    job to the pool only when the previous one has finished, so waiting
+    jobs never hold a worker. At most max_pending jobs may be queued; the
+    last history finished jobs are kept for status queries.
+    """
+
+    def __init__(self, max_workers=4, max_pending=32, history=100):
+        self.max_pending = max_pending
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="glfs-job")
+        self._jobs = OrderedDict()
+        # target -> jobs waiting for the running one, oldest first
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def submit(self, kind, func, target=None):
+        """Queue func(job) to run in the background and return the job"""
+        job = Job(kind, target)
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if pending >= self.max_pending:
+                raise JobQueueFull("Too many operations are already queued")
+            self._prune()
+            self._jobs[job.id] = job
+            if target is not None:
+                waiting = self._waiting.get(target)
+                if waiting is not None:
+                    # Another job on this target is queued or running
+                    waiting.append((job, func))
+                    return job
+                self._waiting[target] = deque()
+        self._pool.submit(self._run, job, func)
+        return job
+
+    def _run(self, job, func):
+        try:
+            job.check_cancelled()
+            job.status = "running"
+            job.started = time.time()
+            job.result = func(job)
+            if isinstance(job.result, dict) and job.result.get("status") == "error":
+                job.status = "error"
+                job.error = job.result.get("message")
+            else:
+                job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "error"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            if job.target is not None:
+                self._next(job.target)
+
+    def _next(self, target):
+        """Start the next job waiting on a target, or release the target"""
+        with self._lock:
+            waiting = self._waiting[target]
+            if not waiting:
+                del self._waiting[target]
+                return
+            job, func = waiting.popleft()
+        self._pool.submit(self._run, job, func)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Request cancellation; returns the job, or None if unknown"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel()
+        with self._lock:
+            waiting = self._waiting.get(job.target)
+            entry = next((entry for entry in waiting or () if entry[0] is job), None)
+            if entry is not None:
+                # Never started, so it can finish right away
+                waiting.remove(entry)
+                job.status = "cancelled"
+                job.finished = time.time()
+        return job
@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 import threading
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMainWindow
@@ -10,7 +11,9 @@ from PyQt5.QtWebEngineWidgets import QWebEngineView
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the Flask app
-from src.app import app, load_config, save_config, detect_minecraft_path, set_default_shaders_path
+from src.app import app
+from src.core import load_config, save_config, detect_minecraft_path, set_default_shaders_path
+from src.server import serve, server_options
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -25,7 +28,7 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.web)
 
 def run_flask():
-    app.run(port=5000)
+    serve(app, port=5000, **server_options(load_config()))
 
 def main():
     print("Starting GLFS application...")
@@ -61,4 +64,6 @@ def main():
     sys.exit(qt_app.exec_())
 
 if __name__ == "__main__":
+    # Pool workers of frozen builds re-run this script
+    multiprocessing.freeze_support()
     main()
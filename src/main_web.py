@@ -1,24 +1,30 @@
 import os
 import sys
-import webview
+import multiprocessing
 from pathlib import Path
 
 # Add the src directory to the Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the Flask app
-from app import app
+from src.app import app
+from src.core import load_config
+from src.server import serve, serve_in_background, server_options
 
 def main():
+    options = server_options(load_config())
     # Check if we're running in development mode
     if len(sys.argv) > 1 and sys.argv[1] == "--dev":
-        # Run Flask directly for development
-        app.run(debug=True, port=5000)
+        # Serve on a fixed port for development, with tracebacks in responses
+        app.debug = True
+        serve(app, port=5000, **options)
     else:
-        # For production, use pywebview
+        # For production, use pywebview on top of the pooled server
+        import webview
+        server = serve_in_background(app, port=0, **options)
         window = webview.create_window(
             "GLFS - Minecraft Bedrock Shader Loader", 
-            app, 
+            f"http://127.0.0.1:{server.server_port}", 
             width=1000, 
             height=700, 
             min_size=(800, 600),
@@ -27,4 +33,6 @@ def main():
         webview.start(debug=True)
 
 if __name__ == "__main__":
+    # Pool workers of frozen builds re-run this script
+    multiprocessing.freeze_support()
     main()
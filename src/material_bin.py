@@ -0,0 +1,295 @@
+import os
+import sys
+import mmap
+import struct
+
+# RenderDragon compiled material definition header
+MAGIC = 0xA11DA1A
+DEFINITION_NAME = "RenderDragon.CompiledMaterialDefinition"
+
+# Encryption variants, stored as four ASCII bytes read as a little-endian u32
+ENCRYPTION_VARIANTS = {
+    0x454E4F4E: "none",               # b'NONE'
+    0x534D504C: "simple_passphrase",  # b'LPMS'
+    0x4B595052: "key_pair",           # b'RPYK'
+}
+
+# bgfx uniform types that carry an optional default value, with its size
+UNIFORM_DATA_SIZES = {2: 16, 3: 36, 4: 64}
+
+# bgfx shader binaries start with one of these
+BGFX_MAGICS = (b'VSH', b'FSH', b'CSH')
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+
+class MaterialBinError(ValueError):
+    """Raised when a file is not a readable material.bin"""
+
+
+class _Reader:
+    """Sequential little-endian reader over a buffer, without copying payloads"""
+
+    def __init__(self, buffer, pos=0):
+        self.buffer = buffer
+        self.pos = pos
+        self.size = len(buffer)
+
+    def _take(self, count):
+        start = self.pos
+        end = start + count
+        if end > self.size:
+            raise MaterialBinError(f"Unexpected end of file at offset {start}")
+        self.pos = end
+        return start
+
+    def u8(self):
+        return self.buffer[self._take(1)]
+
+    def u16(self):
+        return _U16.unpack_from(self.buffer, self._take(2))[0]
+
+    def u32(self):
+        return _U32.unpack_from(self.buffer, self._take(4))[0]
+
+    def u64(self):
+        return _U64.unpack_from(self.buffer, self._take(8))[0]
+
+    def bool(self):
+        return self.u8() != 0
+
+    def span(self):
+        """Skip a u32-length-prefixed byte array, returning its (offset, size)"""
+        size = self.u32()
+        return self._take(size), size
+
+    def string(self):
+        offset, size = self.span()
+        return bytes(self.buffer[offset:offset + size]).decode('utf-8', errors='replace')
+
+    def skip(self, count):
+        self._take(count)
+
+
+class MaterialBin:
+    """Lazily decoded view of a RenderDragon material.bin.
+
+    Opened files are memory-mapped; the header and pass table are decoded
+    on first access and shader blobs are only located, never copied. The
+    layout follows the v22 CompiledMaterialDefinition format (1.19.60+).
+    """
+
+    def __init__(self, buffer, path=None):
+        self.buffer = buffer
+        self.path = path
+        self._mmap = None
+        self._header = None
+        self._header_end = None
+        self._passes = None
+        self._pass_error = None
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a material.bin for reading"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise MaterialBinError("File is empty")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        material = cls(mapped, path)
+        material._mmap = mapped
+        return material
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self):
+        return len(self.buffer)
+
+    @property
+    def header(self):
+        """Decode the definition header: version, encryption, name and parent"""
+        if self._header is None:
+            reader = _Reader(self.buffer)
+            if reader.u64() != MAGIC:
+                raise MaterialBinError("Not a RenderDragon material.bin (bad magic)")
+            if reader.string() != DEFINITION_NAME:
+                raise MaterialBinError("Unknown material definition type")
+            version = reader.u64()
+            encryption_value = reader.u32()
+            encryption = ENCRYPTION_VARIANTS.get(encryption_value, f"unknown({encryption_value:#x})")
+            header = {"version": version, "encryption": encryption, "name": None, "parent": None}
+            if encryption == "none":
+                header["name"] = reader.string()
+                if reader.bool():
+                    header["parent"] = reader.string()
+            self._header = header
+            self._header_end = reader.pos
+        return self._header
+
+    @property
+    def passes(self):
+        """Decode the pass table.
+
+        Each pass is a dict with its name, byte range, fallback pass and
+        variants; each variant lists its shader stages with the offset and
+        size of the stage's bgfx blob in the file. Encrypted materials have
+        no readable pass table and return an empty list.
+        """
+        if self._passes is None:
+            header = self.header
+            if header["encryption"] != "none":
+                self._passes = []
+            else:
+                self._passes = self._read_passes(_Reader(self.buffer, self._header_end))
+        return self._passes
+
+    def _read_passes(self, reader):
+        # Buffers
+        for _ in range(reader.u8()):
+            reader.string()            # name
+            reader.skip(2 + 1 + 1)     # reg1, access, precision
+            reader.skip(1 + 1)         # unordered access, type
+            reader.string()            # texture format
+            reader.skip(4 + 1)         # always one, reg2
+            if reader.bool():
+                reader.string()        # default texture path
+            if reader.bool():
+                reader.skip(2)         # sampler filter and wrap
+            if reader.bool():
+                reader.string()        # custom struct name
+                reader.skip(4)         # custom struct size
+
+        # Uniforms
+        for _ in range(reader.u16()):
+            reader.string()
+            uniform_type = reader.u16()
+            if uniform_type in UNIFORM_DATA_SIZES and reader.bool():
+                reader.skip(UNIFORM_DATA_SIZES[uniform_type])
+
+        # Uniform overrides
+        for _ in range(reader.u16()):
+            reader.string()
+            reader.string()
+
+        passes = []
+        for _ in range(reader.u16()):
+            start = reader.pos
+            name = reader.string()
+            platforms = reader.string()
+            fallback = reader.string()
+            if reader.bool():
+                reader.skip(2)         # default blend mode
+            for _ in range(reader.u16()):
+                reader.string()        # default flag name
+                reader.string()        # default flag value
+            variants = []
+            for _ in range(reader.u16()):
+                variants.append(self._read_variant(reader))
+            passes.append({
+                "name": name,
+                "offset": start,
+                "end": reader.pos,
+                "platform_support": platforms,
+                "fallback": fallback or None,
+                "variants": variants
+            })
+        return passes
+
+    def _read_variant(self, reader):
+        supported = reader.bool()
+        flags = {}
+        for _ in range(reader.u16()):
+            key = reader.string()
+            flags[key] = reader.string()
+        stages = []
+        for _ in range(reader.u16()):
+            stage_name = reader.string()
+            platform_name = reader.string()
+            reader.skip(2)             # stage and platform enum values
+            for _ in range(reader.u16()):
+                reader.string()        # input name
+                reader.skip(1 + 2 + 1) # type, attribute index and sub-index, per-instance
+                if reader.bool():
+                    reader.skip(1)     # precision
+                if reader.bool():
+                    reader.skip(1)     # interpolation
+            source_hash = reader.u64()
+            offset, size = reader.span()
+            stages.append({
+                "stage": stage_name,
+                "platform": platform_name,
+                "hash": f"{source_hash:016x}",
+                "offset": offset,
+                "size": size
+            })
+        return {"supported": supported, "flags": flags, "stages": stages}
+
+    def scan_blobs(self):
+        """Locate bgfx shader blobs by their length prefix and magic.
+
+        Used when the pass table cannot be decoded, e.g. for a newer layout.
+        Returns a list of {"kind", "offset", "size"} sorted by offset.
+        """
+        buffer = self.buffer
+        blobs = []
+        for magic in BGFX_MAGICS:
+            pos = buffer.find(magic, 4)
+            while pos != -1:
+                size = _U32.unpack_from(buffer, pos - 4)[0]
+                if 8 <= size <= len(buffer) - pos:
+                    blobs.append({"kind": magic.decode(), "offset": pos, "size": size})
+                pos = buffer.find(magic, pos + 1)
+        blobs.sort(key=lambda blob: blob["offset"])
+        return blobs
+
+    def summary(self):
+        """Summarize passes, stages and platforms for the shader list"""
+        header = self.header
+        summary = dict(header)
+        summary["passes"] = None
+        try:
+            passes = self.passes
+        except MaterialBinError as e:
+            summary["error"] = f"Pass table not decoded: {e}"
+            summary["blobs"] = len(self.scan_blobs())
+            return summary
+
+        platforms = set()
+        summary["passes"] = []
+        for material_pass in passes:
+            stages = set()
+            pass_platforms = set()
+            for variant in material_pass["variants"]:
+                for stage in variant["stages"]:
+                    stages.add(stage["stage"])
+                    pass_platforms.add(stage["platform"])
+            platforms.update(pass_platforms)
+            summary["passes"].append({
+                "name": material_pass["name"],
+                "variants": len(material_pass["variants"]),
+                "stages": sorted(stages),
+                "platforms": sorted(pass_platforms)
+            })
+        summary["platforms"] = sorted(platforms)
+        return summary
+
+
+def read_material_summary(path):
+    """Summarize a material.bin file, or None if it is not one"""
+    try:
+        with MaterialBin.open(path) as material:
+            return material.summary()
+    except (OSError, ValueError) as e:
+        print(f"Failed to read material {path}: {e}", file=sys.stderr)
+        return None
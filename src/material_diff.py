@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import zipfile
+import argparse
+import threading
+
+from src.material_bin import MaterialBin, MaterialBinError
+
+MATERIAL_SUFFIX = '.material.bin'
+
+# Bump when the sections computed for a file change; cached hashes are then dropped
+SCHEMA_VERSION = 1
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def section_hashes(material):
+    """Hash each structural section of a material.bin.
+
+    Sections are "definition" (header, buffers and uniforms) and one
+    "pass:<name>" per pass. Materials whose pass table cannot be decoded
+    get a single "file" section.
+    """
+    view = memoryview(material.buffer)
+    try:
+        try:
+            passes = material.passes
+        except MaterialBinError:
+            return {"file": _digest(view)}
+        first = passes[0]["offset"] if passes else len(view)
+        sections = {"definition": _digest(view[:first])}
+        for material_pass in passes:
+            sections["pass:" + material_pass["name"]] = _digest(view[material_pass["offset"]:material_pass["end"]])
+        return sections
+    finally:
+        view.release()
+
+
+class SectionCache:
+    """Persistent cache of per-file section hashes, keyed by path, size and mtime"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS sections")
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sections ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, data TEXT)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, path):
+        """Get the section hashes of a file, computing them if it changed"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT size, mtime_ns, data FROM sections WHERE path = ?", (path,)).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                return json.loads(row[2])
+        # Libraries list materials as plain .bin files, so any .bin is parsed if it can be
+        if path.endswith('.bin') and st.st_size:
+            try:
+                with MaterialBin.open(path) as material:
+                    sections = section_hashes(material)
+            except MaterialBinError:
+                sections = {"file": _hash_file(path)}
+        else:
+            sections = {"file": _hash_file(path)}
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?)",
+                         (path, st.st_size, st.st_mtime_ns, json.dumps(sections)))
+            conn.commit()
+        return sections
+
+
+def _hash_file(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stage_digests(material, material_pass):
+    """Hash the stage blobs of one pass, keyed by (variant, stage, platform)"""
+    view = memoryview(material.buffer)
+    try:
+        digests = {}
+        for index, variant in enumerate(material_pass["variants"]):
+            for stage in variant["stages"]:
+                key = (index, stage["stage"], stage["platform"])
+                digests[key] = _digest(view[stage["offset"]:stage["offset"] + stage["size"]])
+        return digests
+    finally:
+        view.release()
+
+
+def diff_materials(old, new, old_sections=None, new_sections=None):
+    """Structurally compare two MaterialBin objects.
+
+    Only sections whose hashes differ are decoded further, down to the
+    individual stage blobs of modified passes.
+    """
+    old_sections = old_sections if old_sections is not None else section_hashes(old)
+    new_sections = new_sections if new_sections is not None else section_hashes(new)
+    if old_sections == new_sections:
+        return None
+    if "file" in old_sections or "file" in new_sections:
+        return {"changed": True, "structured": False}
+
+    old_names = {key[5:] for key in old_sections if key.startswith("pass:")}
+    new_names = {key[5:] for key in new_sections if key.startswith("pass:")}
+    modified = []
+    changed = sorted(name for name in old_names & new_names
+                     if old_sections["pass:" + name] != new_sections["pass:" + name])
+    if changed:
+        old_passes = {p["name"]: p for p in old.passes}
+        new_passes = {p["name"]: p for p in new.passes}
+        for name in changed:
+            old_stages = _stage_digests(old, old_passes[name])
+            new_stages = _stage_digests(new, new_passes[name])
+            stages = [
+                {"variant": key[0], "stage": key[1], "platform": key[2],
+                 "change": "added" if key not in old_stages else
+                           "removed" if key not in new_stages else "modified"}
+                for key in sorted(set(old_stages) | set(new_stages))
+                if old_stages.get(key) != new_stages.get(key)
+            ]
+            modified.append({"name": name, "stages": stages})
+    return {
+        "changed": True,
+        "structured": True,
+        "definition_changed": old_sections.get("definition") != new_sections.get("definition"),
+        "passes": {
+            "added": sorted(new_names - old_names),
+            "removed": sorted(old_names - new_names),
+            "modified": modified
+        }
+    }
+
+
+def diff_material_files(old_path, new_path, cache=None):
+    """Structurally compare two material.bin files"""
+    try:
+        if os.path.samefile(old_path, new_path):
+            return None
+    except OSError:
+        pass
+    if cache is not None:
+        old_sections, new_sections = cache.get(old_path), cache.get(new_path)
+        if old_sections == new_sections:
+            return None
+    else:
+        old_sections = new_sections = None
+    with MaterialBin.open(old_path) as old, MaterialBin.open(new_path) as new:
+        return diff_materials(old, new, old_sections, new_sections)
+
+
+def _walk(root):
+    """Map relative file paths under root to their absolute paths"""
+    files = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    files[os.path.relpath(entry.path, root).replace(os.sep, '/')] = entry.path
+    return files
+
+
+def _diff_directories(old_root, new_root, cache):
+    old_files, new_files = _walk(old_root), _walk(new_root)
+    modified = []
+    for path in sorted(set(old_files) & set(new_files)):
+        old_path, new_path = old_files[path], new_files[path]
+        try:
+            if os.path.samefile(old_path, new_path):
+                continue
+        except OSError:
+            pass
+        if cache is not None:
+            unchanged = cache.get(old_path) == cache.get(new_path)
+        else:
+            unchanged = (os.path.getsize(old_path) == os.path.getsize(new_path)
+                         and _hash_file(old_path) == _hash_file(new_path))
+        if unchanged:
+            continue
+        change = {"path": path}
+        if path.endswith(MATERIAL_SUFFIX):
+            try:
+                change["material"] = diff_material_files(old_path, new_path, cache)
+            except (OSError, MaterialBinError) as e:
+                change["error"] = str(e)
+        modified.append(change)
+    return old_files, new_files, modified
+
+
+def _diff_archives(old_path, new_path):
+    with zipfile.ZipFile(old_path) as old_zip, zipfile.ZipFile(new_path) as new_zip:
+        old_infos = {i.filename: i for i in old_zip.infolist() if not i.is_dir()}
+        new_infos = {i.filename: i for i in new_zip.infolist() if not i.is_dir()}
+        modified = []
+        # Size and CRC come from the central directory, so unchanged members are never read
+        for path in sorted(set(old_infos) & set(new_infos)):
+            old_info, new_info = old_infos[path], new_infos[path]
+            if (old_info.file_size, old_info.CRC) == (new_info.file_size, new_info.CRC):
+                continue
+            change = {"path": path}
+            if path.endswith(MATERIAL_SUFFIX):
+                try:
+                    change["material"] = diff_materials(MaterialBin(old_zip.read(old_info)),
+                                                        MaterialBin(new_zip.read(new_info)))
+                except MaterialBinError as e:
+                    change["error"] = str(e)
+            modified.append(change)
+    return old_infos, new_infos, modified
+
+
+def diff_paths(old_path, new_path, cache=None):
+    """Compare two material.bin files, two pack directories or two .mcpack archives"""
+    if os.path.isdir(old_path) and os.path.isdir(new_path):
+        old_files, new_files, modified = _diff_directories(old_path, new_path, cache)
+    elif zipfile.is_zipfile(old_path) and zipfile.is_zipfile(new_path):
+        old_files, new_files, modified = _diff_archives(old_path, new_path)
+    elif os.path.isfile(old_path) and os.path.isfile(new_path):
+        return {"type": "material", "material": diff_material_files(old_path, new_path, cache)}
+    else:
+        raise ValueError("Both paths must be material.bin files, pack folders or .mcpack files")
+    return {
+        "type": "pack",
+        "added": sorted(set(new_files) - set(old_files)),
+        "removed": sorted(set(old_files) - set(new_files)),
+        "modified": modified
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Structurally compare two material.bin files or packs")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--cache", help="section hash cache database to reuse between runs")
+    args = parser.parse_args(argv)
+    try:
+        result = diff_paths(args.old, args.new, SectionCache(args.cache) if args.cache else None)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"status": "error", "message": str(e)}))
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import re
+import sys
+import json
+import zipfile
+
+MANIFEST_NAME = 'manifest.json'
+
+# Line comments are tolerated by the game in manifest.json
+_COMMENT_RE = re.compile(r'^\s*//.*$', re.MULTILINE)
+
+
+def find_manifest(names):
+    """Pick the top-most manifest.json from a list of zip member names"""
+    candidates = [n for n in names if n == MANIFEST_NAME or n.endswith('/' + MANIFEST_NAME)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda n: n.count('/'))
+
+
+def parse_manifest(data):
+    """Parse manifest.json bytes"""
+    text = data.decode('utf-8-sig')
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_COMMENT_RE.sub('', text))
+
+
+def format_version(version):
+    """Format a [major, minor, patch] version list as a string"""
+    if isinstance(version, (list, tuple)):
+        return '.'.join(str(part) for part in version)
+    return str(version) if version is not None else None
+
+
+def read_pack_manifest(pack_path):
+    """Read pack metadata from an .mcpack's manifest.json.
+
+    Only the zip central directory and the manifest entry are read; the rest
+    of the archive is never decompressed. Returns None if the pack has no
+    readable manifest.
+    """
+    try:
+        with zipfile.ZipFile(pack_path) as zf:
+            manifest_name = find_manifest(zf.namelist())
+            if manifest_name is None:
+                return None
+            manifest = parse_manifest(zf.read(manifest_name))
+    except (OSError, ValueError, zipfile.BadZipFile, KeyError) as e:
+        print(f"Failed to read manifest of {pack_path}: {e}", file=sys.stderr)
+        return None
+
+    header = manifest.get("header", {}) if isinstance(manifest, dict) else {}
+    return {
+        "name": header.get("name"),
+        "description": header.get("description"),
+        "uuid": header.get("uuid"),
+        "version": format_version(header.get("version")),
+        "min_engine_version": format_version(header.get("min_engine_version"))
+    }
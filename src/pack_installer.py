@@ -0,0 +1,213 @@
+import os
+import json
+import shutil
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.activation import swap_directory
+from src.config_store import write_json_atomic
+from src.mcpack_meta import find_manifest
+
+# Bytes streamed per read, per worker; bounds peak memory to workers * CHUNK_SIZE
+CHUNK_SIZE = 1024 * 1024
+
+# Extraction threads; zlib releases the GIL so members inflate in parallel
+DEFAULT_WORKERS = 4
+
+# Per-pack record of installed files (relative path -> [size, crc32])
+FILE_MANIFEST_NAME = '.glfs_manifest.json'
+
+
+def member_target(root, name, prefix=''):
+    """Resolve a zip member to a path under root, rejecting entries that escape it"""
+    relative = name[len(prefix):] if prefix and name.startswith(prefix) else name
+    target = os.path.normpath(os.path.join(root, *relative.split('/')))
+    if os.path.isabs(relative) or not target.startswith(os.path.normpath(root) + os.sep):
+        raise ValueError(f"Unsafe path in pack: {name}")
+    return target
+
+
+def pack_root_prefix(names):
+    """Get the folder a pack's manifest.json lives in, so it lands at the pack root"""
+    manifest = find_manifest(names)
+    if manifest is None:
+        raise ValueError("Pack has no manifest.json")
+    return manifest[:-len('manifest.json')]
+
+
+class _Progress:
+    """Thread-safe byte counter forwarding to a progress callback"""
+
+    def __init__(self, total, callback):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        with self._lock:
+            self.done += count
+            done = self.done
+        if self.callback:
+            self.callback(done, self.total)
+
+
+def _extract_members(pack_path, members, staging, prefix, workers, progress):
+    """Stream zip members into staging using a pool of threads"""
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract(info):
+        # ZipFile handles share a file position, so each worker opens its own
+        zf = getattr(local, 'zf', None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(pack_path)
+            with handles_lock:
+                handles.append(zf)
+        target = member_target(staging, info.filename, prefix)
+        with zf.open(info) as src, open(target, 'wb') as dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                progress.add(len(chunk))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(extract, info) for info in members]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        for zf in handles:
+            zf.close()
+
+
+def read_file_manifest(pack_dir):
+    """Load the file manifest written when a pack directory was installed"""
+    try:
+        with open(os.path.join(pack_dir, FILE_MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def diff_file_manifests(installed, wanted):
+    """Compare two {path: [size, crc32]} maps.
+
+    Returns (changed, removed): paths to write and paths to delete.
+    """
+    changed = [path for path, entry in wanted.items() if installed.get(path) != entry]
+    removed = [path for path in installed if path not in wanted]
+    return changed, removed
+
+
+def _install_full(pack_path, dest_dir, members, prefix, files, workers, counter):
+    """Extract every member into a staging directory and swap it into place"""
+    staging = f"{dest_dir}.glfs-staging"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    try:
+        for directory in {os.path.dirname(member_target(staging, info.filename, prefix)) for info in members}:
+            os.makedirs(directory, exist_ok=True)
+        _extract_members(pack_path, members, staging, prefix, workers, counter)
+        write_json_atomic(os.path.join(staging, FILE_MANIFEST_NAME), {"source": pack_path, "files": files})
+        swap_directory(staging, dest_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _install_delta(pack_path, dest_dir, members, prefix, files, removed, workers, counter):
+    """Write only changed members and delete removed files in an installed pack.
+
+    Changed members are extracted to a sibling staging directory first and
+    each is renamed over its target, so no file is ever seen half-written.
+    """
+    staging = f"{dest_dir}.glfs-staging"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    try:
+        for directory in {os.path.dirname(member_target(staging, info.filename, prefix)) for info in members}:
+            os.makedirs(directory, exist_ok=True)
+        _extract_members(pack_path, members, staging, prefix, workers, counter)
+        for info in members:
+            target = member_target(dest_dir, info.filename, prefix)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(member_target(staging, info.filename, prefix), target)
+        for path in removed:
+            try:
+                os.remove(member_target(dest_dir, path))
+            except FileNotFoundError:
+                pass
+        write_json_atomic(os.path.join(dest_dir, FILE_MANIFEST_NAME), {"source": pack_path, "files": files})
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _pack_members(pack_path):
+    """Get a pack's root prefix, file members and {path: [size, crc32]} map"""
+    with zipfile.ZipFile(pack_path) as zf:
+        infos = zf.infolist()
+    prefix = pack_root_prefix([info.filename for info in infos])
+    members = [info for info in infos if not info.is_dir() and info.filename.startswith(prefix)]
+    files = {info.filename[len(prefix):]: [info.file_size, info.CRC] for info in members}
+    return prefix, members, files
+
+
+def pack_file_manifest(pack_path):
+    """Get the {path: [size, crc32]} map an install of this pack would record.
+
+    Only the zip's central directory is read.
+    """
+    return _pack_members(pack_path)[2]
+
+
+def install_pack(pack_path, dest_dir, workers=DEFAULT_WORKERS, progress=None):
+    """Extract an .mcpack into a resource pack directory.
+
+    Members are streamed in chunks by a pool of threads. A fresh install is
+    staged next to dest_dir and swapped into place. If dest_dir already holds
+    an installed pack, only files whose size or CRC differ are extracted and
+    files missing from the new pack are deleted. progress(done_bytes,
+    total_bytes) is called as data is written.
+    """
+    prefix, members, files = _pack_members(pack_path)
+
+    installed = read_file_manifest(dest_dir) if os.path.isdir(dest_dir) else None
+    if installed is not None:
+        installed_files = installed.get("files", {})
+        # Files edited or deleted behind our back no longer match the record
+        for path, entry in list(installed_files.items()):
+            try:
+                if os.path.getsize(member_target(dest_dir, path)) != entry[0]:
+                    del installed_files[path]
+            except (OSError, ValueError):
+                del installed_files[path]
+        changed, removed = diff_file_manifests(installed_files, files)
+        changed = set(changed)
+        members = [info for info in members if info.filename[len(prefix):] in changed]
+    else:
+        removed = []
+
+    total = sum(info.file_size for info in members)
+    counter = _Progress(total, progress)
+    if progress:
+        progress(0, total)
+
+    if installed is not None:
+        _install_delta(pack_path, dest_dir, members, prefix, files, removed, workers, counter)
+        mode = "delta"
+    else:
+        _install_full(pack_path, dest_dir, members, prefix, files, workers, counter)
+        mode = "full"
+    return {"mode": mode, "files": len(members), "removed": len(removed), "bytes": total}
@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import uuid
+import sqlite3
+import zipfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.blob_store import hash_file
+from src.material_bin import MaterialBin, MaterialBinError
+from src.mcpack_meta import find_manifest, parse_manifest
+
+# Bump when the checks change so earlier verdicts are thrown away
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+DROP TABLE IF EXISTS files;
+DROP TABLE IF EXISTS results;
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE results (
+    hash TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    errors TEXT NOT NULL
+);
+"""
+
+# Files the verifier understands; anything else is reported as unchecked
+VERIFIED_EXTENSIONS = ('.mcpack', '.bin')
+
+# Fewer stale files than this are verified in-process rather than on a pool
+POOL_THRESHOLD = 4
+
+# Stop listing problems in one pack after this many
+MAX_ERRORS = 20
+
+# Members are streamed in reads of this size, so memory per worker stays bounded
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a material.bin buffered for its header check; the header is far smaller
+MATERIAL_HEADER_BYTES = 64 * 1024
+
+# Larger manifests are cut off here and reported as unparseable
+MAX_MANIFEST_BYTES = 1024 * 1024
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def _is_version(value):
+    return isinstance(value, list) and len(value) == 3 and all(isinstance(part, int) for part in value)
+
+
+def check_manifest_schema(manifest):
+    """List problems with a resource pack manifest's required fields"""
+    if not isinstance(manifest, dict):
+        return ["manifest.json is not an object"]
+    errors = []
+    if "format_version" not in manifest:
+        errors.append("manifest.json has no format_version")
+    header = manifest.get("header")
+    if not isinstance(header, dict):
+        errors.append("manifest.json has no header")
+    else:
+        if not _is_uuid(header.get("uuid")):
+            errors.append("header.uuid is missing or not a UUID")
+        if not _is_version(header.get("version")):
+            errors.append("header.version is missing or not [major, minor, patch]")
+    modules = manifest.get("modules")
+    if not isinstance(modules, list) or not modules:
+        errors.append("manifest.json has no modules")
+    else:
+        for index, module in enumerate(modules):
+            if not isinstance(module, dict) or not module.get("type"):
+                errors.append(f"modules[{index}] has no type")
+            elif not _is_uuid(module.get("uuid")):
+                errors.append(f"modules[{index}].uuid is missing or not a UUID")
+    return errors
+
+
+def check_material_header(buffer):
+    """Get the problem with a material.bin's header, or None"""
+    try:
+        MaterialBin(buffer).header
+    except MaterialBinError as e:
+        return str(e)
+    return None
+
+
+def verify_pack(path):
+    """Check an .mcpack's member CRCs, manifest and material headers; returns a list of problems"""
+    errors = []
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            manifest_name = find_manifest(names)
+            if manifest_name is None:
+                errors.append("Pack has no manifest.json")
+            for info in zf.infolist():
+                if len(errors) >= MAX_ERRORS:
+                    break
+                if info.is_dir():
+                    continue
+                if info.filename == manifest_name:
+                    keep = MAX_MANIFEST_BYTES
+                elif info.filename.endswith('.material.bin'):
+                    keep = MATERIAL_HEADER_BYTES
+                else:
+                    keep = 0
+                try:
+                    with zf.open(info) as member:
+                        data = member.read(keep) if keep else b''
+                        # Reading a member to the end checks its CRC
+                        while member.read(READ_CHUNK_SIZE):
+                            pass
+                except (zipfile.BadZipFile, OSError, EOFError, NotImplementedError) as e:
+                    errors.append(f"{info.filename}: {e}")
+                    continue
+                if info.filename == manifest_name:
+                    try:
+                        errors.extend(check_manifest_schema(parse_manifest(data)))
+                    except ValueError as e:
+                        errors.append(f"manifest.json does not parse: {e}")
+                elif info.filename.endswith('.material.bin'):
+                    problem = check_material_header(data)
+                    if problem:
+                        errors.append(f"{info.filename}: {problem}")
+    except (OSError, zipfile.BadZipFile) as e:
+        errors.append(f"Not a readable zip archive: {e}")
+    return errors[:MAX_ERRORS]
+
+
+def verify_material(path):
+    """Check a material.bin's header; returns a list of problems"""
+    try:
+        with MaterialBin.open(path) as material:
+            material.header
+    except (OSError, ValueError) as e:
+        return [str(e)]
+    return []
+
+
+def verify_file(path):
+    """Verify one library file; returns {"status": "ok" or "failed", "errors": [...]}"""
+    errors = verify_pack(path) if path.endswith('.mcpack') else verify_material(path)
+    return {"status": "failed" if errors else "ok", "errors": errors}
+
+
+# Read-only connection to the result cache, one per pool worker
+_worker_conn = None
+
+
+def _cached_result(db_path, digest):
+    global _worker_conn
+    try:
+        if _worker_conn is None:
+            _worker_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        row = _worker_conn.execute("SELECT status, errors FROM results WHERE hash = ?", (digest,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return {"status": row[0], "errors": json.loads(row[1])} if row else None
+
+
+def _hash_and_verify(path, db_path):
+    """Pool task: hash a file and verify it unless its content was verified before"""
+    digest = hash_file(path)
+    cached = _cached_result(db_path, digest)
+    if cached is not None:
+        return digest, cached
+    return digest, verify_file(path)
+
+
+class PackVerifier:
+    """Integrity checks of library files, cached by content hash.
+
+    A file's hash is remembered by (path, size, mtime), and verdicts are
+    stored by hash, so only new or changed files are hashed and a file
+    whose content was verified before, e.g. a renamed copy, is not checked
+    again. Whole-library runs hash and verify on a process pool; zip CRC
+    checks are CPU bound and would serialize on the GIL in threads.
+    """
+
+    def __init__(self, db_path, workers=None):
+        self.db_path = db_path
+        self.workers = workers
+        # Changes whenever a verdict does, for list ETags
+        self.generation = 0
+        self._conn = None
+        self._files = None
+        self._results = None
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript(SCHEMA)
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self):
+        if self._files is None:
+            conn = self._connect()
+            self._files = {path: (size, mtime_ns, digest)
+                           for path, size, mtime_ns, digest in conn.execute("SELECT * FROM files")}
+            self._results = {digest: {"status": status, "errors": json.loads(errors)}
+                             for digest, status, errors in conn.execute("SELECT * FROM results")}
+
+    def status(self, entry):
+        """Get the cached verdict for a library entry: ok, failed, pending or unchecked"""
+        if not entry["name"].endswith(VERIFIED_EXTENSIONS):
+            return {"status": "unchecked", "errors": []}
+        with self._lock:
+            self._load()
+            known = self._files.get(entry["path"])
+            if known and known[:2] == (entry["size"], entry["mtime_ns"]):
+                result = self._results.get(known[2])
+                if result is not None:
+                    return result
+        return {"status": "pending", "errors": []}
+
+    def stale(self, entries):
+        """List the entries whose verdict is not cached"""
+        return [entry for entry in entries if self.status(entry)["status"] == "pending"]
+
+    def _record(self, path, size, mtime_ns, digest, result):
+        with self._lock:
+            self._load()
+            self._files[path] = (size, mtime_ns, digest)
+            self._results[digest] = result
+            self.generation += 1
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, size, mtime_ns, digest))
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                         (digest, result["status"], json.dumps(result["errors"])))
+            conn.commit()
+
+    def check(self, path):
+        """Verify one file in-process, using the cache; returns its verdict"""
+        st = os.stat(path)
+        entry = {"name": os.path.basename(path), "path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        result = self.status(entry)
+        if result["status"] != "pending":
+            return result
+        return self._verify_one(entry)
+
+    def verify(self, entries, progress=None):
+        """Verify every stale entry, on a process pool when there are several.
+
+        progress(done, total) is called after each file and may raise to
+        stop early. Returns counts of files by verdict.
+        """
+        stale = self.stale(entries)
+        total = len(stale)
+        if progress:
+            progress(0, total)
+        # Pool workers read earlier verdicts straight from the database
+        self._connect()
+        if total < POOL_THRESHOLD:
+            for done, entry in enumerate(stale, 1):
+                try:
+                    self._verify_one(entry)
+                except OSError as e:
+                    print(f"Failed to verify {entry['path']}: {e}", file=sys.stderr)
+                if progress:
+                    progress(done, total)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [(entry, pool.submit(_hash_and_verify, entry["path"], self.db_path)) for entry in stale]
+                try:
+                    for done, (entry, future) in enumerate(futures, 1):
+                        try:
+                            digest, result = future.result()
+                        except OSError as e:
+                            print(f"Failed to verify {entry['path']}: {e}", file=sys.stderr)
+                        else:
+                            self._record(entry["path"], entry["size"], entry["mtime_ns"], digest, result)
+                        if progress:
+                            progress(done, total)
+                except BaseException:
+                    for _, future in futures:
+                        future.cancel()
+                    raise
+
+        counts = {}
+        for entry in entries:
+            status = self.status(entry)["status"]
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def _verify_one(self, entry):
+        digest = hash_file(entry["path"])
+        with self._lock:
+            self._load()
+            result = self._results.get(digest)
+        if result is None:
+            result = verify_file(entry["path"])
+        self._record(entry["path"], entry["size"], entry["mtime_ns"], digest, result)
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
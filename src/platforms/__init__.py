@@ -0,0 +1,20 @@
+"""Platform services: install detection, file dialogs and game launch.
+
+The backend for the running OS is imported on first use, so importing the
+shader-management core never pulls in winreg, tkinter or a GUI toolkit.
+"""
+import os
+
+_backend = None
+
+
+def get_platform():
+    """Get the platform backend for this OS"""
+    global _backend
+    if _backend is None:
+        if os.name == 'nt':
+            from src.platforms.windows import WindowsPlatform as backend
+        else:
+            from src.platforms.posix import PosixPlatform as backend
+        _backend = backend()
+    return _backend
@@ -0,0 +1,63 @@
+import os
+import sys
+
+
+class Platform:
+    """Platform services shared by every backend.
+
+    Subclasses describe where the game keeps its data and how it is
+    launched. Dialogs use tkinter, imported only when a dialog is shown.
+    """
+
+    name = "generic"
+
+    def data_dir(self):
+        """Directory for GLFS caches and indexes"""
+        return os.path.join(os.path.expanduser('~'), '.glfs')
+
+    def com_mojang_candidates(self):
+        """Possible locations of the game's com.mojang folder, most likely first"""
+        return []
+
+    def detect_com_mojang_path(self):
+        """Find the game's com.mojang folder, or "" if it is not installed"""
+        for path in self.com_mojang_candidates():
+            if path and os.path.exists(path):
+                return path
+        return ""
+
+    def detect_install_path(self):
+        """Find the game's installation folder, or None"""
+        return self.detect_com_mojang_path() or None
+
+    def resource_packs_dir(self):
+        """Get the game's resource_packs directory"""
+        candidates = self.com_mojang_candidates()
+        mc_local = self.detect_com_mojang_path() or (candidates[0] if candidates else self.data_dir())
+        return os.path.join(mc_local, 'resource_packs')
+
+    def _tk_dialog(self, ask, **options):
+        try:
+            import tkinter as tk
+            from tkinter import filedialog
+        except ImportError as e:
+            print(f"File dialogs are unavailable: {e}", file=sys.stderr)
+            return ""
+        root = tk.Tk()
+        root.withdraw()
+        try:
+            return getattr(filedialog, ask)(**{k: v for k, v in options.items() if v is not None}) or ""
+        finally:
+            root.destroy()
+
+    def ask_directory(self, title=None, initial_dir=None):
+        """Ask the user for a folder; returns "" if cancelled"""
+        return self._tk_dialog('askdirectory', title=title, initialdir=initial_dir)
+
+    def ask_open_file(self, title=None, initial_dir=None, filetypes=None):
+        """Ask the user for a file to open; returns "" if cancelled"""
+        return self._tk_dialog('askopenfilename', title=title, initialdir=initial_dir, filetypes=filetypes)
+
+    def launch_minecraft(self, brd_path=None):
+        """Start the game, through BetterRenderDragon if brd_path is given; returns a status dict"""
+        return {'status': 'error', 'message': f'Launching Minecraft is not supported on {self.name}'}
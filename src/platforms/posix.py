@@ -0,0 +1,31 @@
+import os
+import shutil
+import subprocess
+
+from src.platforms.base import Platform
+
+
+def _xdg_data_home():
+    return os.environ.get('XDG_DATA_HOME', os.path.expanduser(os.path.join('~', '.local', 'share')))
+
+
+class PosixPlatform(Platform):
+    """Linux and macOS, where the game runs through mcpelauncher if at all"""
+
+    name = "POSIX"
+
+    def data_dir(self):
+        return os.path.join(_xdg_data_home(), 'glfs')
+
+    def com_mojang_candidates(self):
+        return [
+            os.path.join(_xdg_data_home(), 'mcpelauncher', 'games', 'com.mojang'),
+            os.path.expanduser(os.path.join('~', 'Library', 'Application Support', 'mcpelauncher', 'games', 'com.mojang'))
+        ]
+
+    def launch_minecraft(self, brd_path=None):
+        launcher = shutil.which('mcpelauncher-client')
+        if launcher is None:
+            return super().launch_minecraft(brd_path)
+        subprocess.Popen([launcher], start_new_session=True)
+        return {'status': 'ok', 'message': 'Minecraft is launching...'}
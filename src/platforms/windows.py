@@ -0,0 +1,66 @@
+import os
+import sys
+import subprocess
+import winreg
+
+from src.platforms.base import Platform
+
+UWP_PACKAGE = 'Microsoft.MinecraftUWP_8wekyb3d8bbwe'
+
+
+class WindowsPlatform(Platform):
+    """Minecraft for Windows (UWP) with BetterRenderDragon"""
+
+    name = "Windows"
+
+    def data_dir(self):
+        return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'GLFS')
+
+    def com_mojang_candidates(self):
+        candidates = []
+        # The Local AppData folder may be redirected, so ask the shell first
+        try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Explorer\User Shell Folders") as key:
+                local_app_data = os.path.expandvars(winreg.QueryValueEx(key, "Local AppData")[0])
+            packages = os.path.join(local_app_data, "Packages")
+            if os.path.exists(packages):
+                for folder in os.listdir(packages):
+                    if folder.startswith("Microsoft.MinecraftUWP"):
+                        candidates.append(os.path.join(packages, folder, "LocalState", "games", "com.mojang"))
+        except OSError as e:
+            print(f"Registry detection failed: {e}", file=sys.stderr)
+        candidates.append(os.path.expandvars(rf"%LOCALAPPDATA%\Packages\{UWP_PACKAGE}\LocalState\games\com.mojang"))
+        candidates.append(os.path.expanduser(rf"~\AppData\Local\Packages\{UWP_PACKAGE}\LocalState\games\com.mojang"))
+        return candidates
+
+    def detect_install_path(self):
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, rf"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\{UWP_PACKAGE}") as key:
+                return winreg.QueryValueEx(key, "InstallLocation")[0]
+        except OSError:
+            # Try common installation paths
+            paths = [
+                os.path.expandvars(rf"%LocalAppData%\Packages\{UWP_PACKAGE}\LocalState\games\com.mojang"),
+                rf"C:\Program Files\WindowsApps\{UWP_PACKAGE}\data"
+            ]
+            for path in paths:
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def resource_packs_dir(self):
+        mc_local = os.path.expandvars(rf'%LOCALAPPDATA%\Packages\{UWP_PACKAGE}\LocalState\games\com.mojang')
+        return os.path.join(mc_local, 'resource_packs')
+
+    def launch_minecraft(self, brd_path=None):
+        if brd_path is None:
+            # Without BetterRenderDragon, go through the Microsoft Store protocol
+            subprocess.Popen(["start", "minecraft://"], shell=True)
+            return {'status': 'ok', 'message': 'Launching Minecraft...'}
+        if not brd_path:
+            return {'status': 'error', 'message': 'BetterRenderDragon path not set'}
+        launch_script = os.path.join(brd_path, 'launchminecraft.bat')
+        if not os.path.exists(launch_script):
+            return {'status': 'error', 'message': 'launchminecraft.bat not found in BRD directory'}
+        subprocess.Popen(launch_script, cwd=brd_path, shell=True)
+        return {'status': 'ok', 'message': 'Minecraft is launching...'}
@@ -0,0 +1,180 @@
+import os
+import shutil
+import hashlib
+
+from src.activation import exchange_directories, stage_file
+from src.pack_installer import install_pack, pack_file_manifest, read_file_manifest
+
+# Resource pack folder that holds the currently applied .mcpack
+ACTIVE_PACK_DIR = 'glfs_active'
+
+# Folder next to the active pack that holds the warm slots
+SLOTS_DIR_NAME = '.glfs_slots'
+
+DEFAULT_MAX_SLOTS = 3
+DEFAULT_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def slot_key(pack_path):
+    """Name of the slot that holds a pack"""
+    path = os.path.normcase(os.path.abspath(pack_path))
+    return hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+
+
+def slots_for(resource_packs_dir, max_slots=DEFAULT_MAX_SLOTS, budget_mb=DEFAULT_BUDGET_BYTES // (1024 * 1024)):
+    """Get the slots kept beside the active pack folder in a resource_packs directory"""
+    return PresetSlots(os.path.join(resource_packs_dir, SLOTS_DIR_NAME),
+                       os.path.join(resource_packs_dir, ACTIVE_PACK_DIR),
+                       max_slots=int(max_slots), budget_bytes=int(budget_mb) * 1024 * 1024)
+
+
+class PresetSlots:
+    """Keep recently used packs fully installed in shadow directories.
+
+    Each slot holds one pack exactly as install_pack leaves it, so switching
+    to a warm slot is a directory exchange. The pack being replaced is
+    parked in a slot of its own rather than deleted, which keeps flipping
+    between presets warm. A slot's last use is its directory mtime; slots
+    beyond max_slots or budget_bytes are evicted least recently used first.
+    Callers serialize switches, e.g. with a job target on active_dir.
+    """
+
+    def __init__(self, root, active_dir, max_slots=DEFAULT_MAX_SLOTS, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.root = root
+        self.active_dir = active_dir
+        self.max_slots = max_slots
+        self.budget_bytes = budget_bytes
+
+    def slot_dir(self, pack_path):
+        return os.path.join(self.root, slot_key(pack_path))
+
+    def slots(self):
+        """List slots, most recently used first"""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for entry in os.scandir(self.root):
+            # Skip install_pack's staging and swap directories
+            if not entry.is_dir() or '.glfs-' in entry.name:
+                continue
+            manifest = read_file_manifest(entry.path) or {}
+            result.append({
+                "key": entry.name,
+                "path": entry.path,
+                "source": manifest.get("source"),
+                "bytes": sum(size for size, _ in manifest.get("files", {}).values()),
+                "used": entry.stat().st_mtime
+            })
+        result.sort(key=lambda slot: slot["used"], reverse=True)
+        return result
+
+    def _holds(self, directory, files):
+        manifest = read_file_manifest(directory) if os.path.isdir(directory) else None
+        return manifest is not None and manifest.get("files") == files
+
+    def is_warm(self, pack_path):
+        """Check whether a slot holds the current contents of a pack"""
+        return self._holds(self.slot_dir(pack_path), pack_file_manifest(pack_path))
+
+    def _seed(self, slot):
+        """Fill an empty slot with links to the active pack's files.
+
+        Packs often share most of their files, so the delta install that
+        follows only extracts what differs. install_pack replaces files
+        rather than writing into them, so the links never change the
+        active pack.
+        """
+        seed = f"{slot}.glfs-seed"
+        if os.path.exists(seed):
+            shutil.rmtree(seed)
+        try:
+            shutil.copytree(self.active_dir, seed, copy_function=stage_file)
+            os.rename(seed, slot)
+        except BaseException:
+            shutil.rmtree(seed, ignore_errors=True)
+            raise
+
+    def stage(self, pack_path, progress=None, files=None):
+        """Install a pack into its slot unless it is already warm.
+
+        A stale slot of the same pack gets a delta install. A pack without
+        a slot is seeded from the active pack and gets a delta against it.
+        """
+        slot = self.slot_dir(pack_path)
+        if files is None:
+            files = pack_file_manifest(pack_path)
+        result = {"mode": "warm", "files": 0, "removed": 0, "bytes": 0}
+        if not self._holds(slot, files):
+            os.makedirs(self.root, exist_ok=True)
+            seeded = not os.path.isdir(slot) and read_file_manifest(self.active_dir) is not None
+            if seeded:
+                self._seed(slot)
+            try:
+                result = install_pack(pack_path, slot, progress=progress)
+            except BaseException:
+                # A half-updated seed must not pass for either pack
+                if seeded:
+                    self._discard(slot)
+                raise
+        os.utime(slot)
+        self.evict(keep={slot})
+        return result
+
+    def _discard(self, directory):
+        # Renamed first so a half-deleted tree is never taken for a slot
+        doomed = f"{directory}.glfs-old"
+        if os.path.exists(doomed):
+            shutil.rmtree(doomed)
+        os.rename(directory, doomed)
+        shutil.rmtree(doomed, ignore_errors=True)
+
+    def _park(self, directory, replacing):
+        """Move a pack that was just swapped out of the active folder into its own slot.
+
+        It is dropped instead when its source is unknown or is the pack that
+        replaced it, i.e. the same file updated in place: that slot now
+        belongs to the new contents.
+        """
+        manifest = read_file_manifest(directory)
+        source = manifest.get("source") if manifest else None
+        parked = self.slot_dir(source) if source else None
+        if parked is None or parked == self.slot_dir(replacing):
+            self._discard(directory)
+            return
+        if os.path.exists(parked):
+            # The copy that was active is newer than whatever the slot holds
+            self._discard(parked)
+        os.rename(directory, parked)
+        os.utime(parked)
+
+    def activate(self, pack_path, progress=None):
+        """Make a pack the active one, staging it into a slot first if needed.
+
+        The staged slot and the active folder are exchanged, so the active
+        folder always holds a complete pack. Returns install_pack's summary
+        with mode "warm" when a slot already held the pack, "unchanged" when
+        it was already active, or the install mode used to stage it.
+        """
+        files = pack_file_manifest(pack_path)
+        if self._holds(self.active_dir, files):
+            return {"mode": "unchanged", "files": 0, "removed": 0, "bytes": 0}
+        result = self.stage(pack_path, progress, files)
+        slot = self.slot_dir(pack_path)
+        if os.path.isdir(self.active_dir):
+            exchange_directories(slot, self.active_dir)
+            self._park(slot, pack_path)
+        else:
+            os.rename(slot, self.active_dir)
+        self.evict()
+        return result
+
+    def evict(self, keep=()):
+        """Remove least recently used slots beyond the slot count and disk budget"""
+        kept = 0
+        used_bytes = 0
+        for slot in self.slots():
+            if slot["path"] in keep or (kept < self.max_slots and used_bytes + slot["bytes"] <= self.budget_bytes):
+                kept += 1
+                used_bytes += slot["bytes"]
+                continue
+            shutil.rmtree(slot["path"], ignore_errors=True)
@@ -0,0 +1,427 @@
+import time
+import queue
+import sys
+import socket
+import selectors
+import threading
+import traceback
+
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from src import metrics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+
+# Enough for the UI's parallel calls, the event stream and a few slow requests
+DEFAULT_WORKERS = 8
+
+# Accepted connections waiting for a worker; beyond this they get a 503
+DEFAULT_QUEUE_SIZE = 64
+
+# Seconds an idle keep-alive connection stays open
+DEFAULT_KEEPALIVE_TIMEOUT = 15
+
+# Event streams run on their own threads, outside the pool, up to this many
+DEFAULT_MAX_STREAMS = 16
+
+# Unread request bodies up to this size are skipped to keep the connection
+MAX_DRAIN_BYTES = 64 * 1024
+
+BUSY_BODY = b'{"status": "error", "message": "Server is busy, try again"}'
+BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BUSY_BODY)).encode() + b"\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n" + BUSY_BODY
+)
+
+rejected_connections = metrics.registry.counter(
+    'glfs_http_rejected_connections_total', 'Connections turned away because the request queue was full')
+
+
+class RequestBody:
+    """wsgi.input for a request with a Content-Length; reads stop where the body ends"""
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.readline(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def readlines(self, hint=-1):
+        return list(self)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def drain(self, limit=MAX_DRAIN_BYTES):
+        """Skip what the app left unread; False if that is too much or the client went away"""
+        if self.remaining > limit:
+            return False
+        while self.remaining:
+            if not self.read(64 * 1024):
+                return False
+        return True
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """HTTP/1.1 handler that keeps connections open between requests.
+
+    Werkzeug's own handler closes every connection after its response, so
+    run_wsgi is replaced: responses are framed by Content-Length or chunked
+    encoding, and whatever the app left unread of a request body is
+    drained before the response goes out. After each request the handler
+    returns, and the server parks the connection until the client sends
+    the next one, so idle connections don't hold a worker. Event streams
+    are handed to a thread of their own.
+
+    This builds on Werkzeug's make_environ and connection_dropped, so
+    Werkzeug is pinned below 2.1; tests/test_server.py covers the framing.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    timeout = DEFAULT_KEEPALIVE_TIMEOUT
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; on a reused connection Nagle would hold the body back
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+    def handle(self):
+        self.close_connection = True
+        self.handed_off = False
+        try:
+            while True:
+                self.raw_requestline = self.rfile.readline(65537)
+                if not self.raw_requestline:
+                    self.close_connection = True
+                    return
+                if len(self.raw_requestline) > 65536:
+                    self.send_error(414)
+                    return
+                if not self.parse_request():
+                    return
+                if self.request_version != 'HTTP/1.1':
+                    self.close_connection = True
+                if 'text/event-stream' in self.headers.get('Accept', ''):
+                    self.handed_off = self.server.start_stream(self)
+                    return
+                self.run_wsgi()
+                # Only a pipelining client has sent more already; serve it here
+                if self.close_connection or not self._pending():
+                    return
+        except (ConnectionError, socket.timeout) as e:
+            self.close_connection = True
+            self.connection_dropped(e)
+
+    def finish(self):
+        # A stream's thread finishes the connection when the stream ends
+        if not self.handed_off:
+            super().finish()
+
+    def _pending(self):
+        """Check without blocking whether the next request is already buffered"""
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def run_wsgi(self):
+        environ = self.environ = self.make_environ()
+        body = None
+        if environ.get("wsgi.input_terminated"):
+            # A chunked body can't be skipped cheaply, so the connection ends with the response
+            self.close_connection = True
+        else:
+            try:
+                length = max(0, int(environ.get("CONTENT_LENGTH") or 0))
+            except ValueError:
+                length = 0
+                self.close_connection = True
+            body = environ["wsgi.input"] = RequestBody(self.rfile, length)
+
+        state = {"status": None, "headers": None, "sent": False, "chunked": False}
+
+        def send_headers():
+            code, _, reason = state["status"].partition(' ')
+            code = int(code)
+            if body is not None and not self.close_connection and not body.drain():
+                self.close_connection = True
+            self.send_response(code, reason)
+            keys = set()
+            for key, value in state["headers"]:
+                self.send_header(key, value)
+                keys.add(key.lower())
+            if not ("content-length" in keys or environ["REQUEST_METHOD"] == "HEAD"
+                    or code < 200 or code in (204, 304)):
+                if self.request_version == 'HTTP/1.1':
+                    state["chunked"] = True
+                    self.send_header("Transfer-Encoding", "chunked")
+                else:
+                    self.close_connection = True
+            if self.close_connection and "connection" not in keys:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            state["sent"] = True
+
+        def write(data):
+            if not state["sent"]:
+                send_headers()
+            if not data or environ["REQUEST_METHOD"] == "HEAD":
+                return
+            if state["chunked"]:
+                self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+            else:
+                self.wfile.write(data)
+            self.wfile.flush()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info:
+                try:
+                    if state["sent"]:
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif state["status"] is not None:
+                raise AssertionError("Headers already set")
+            state["status"], state["headers"] = status, headers
+            return write
+
+        def execute(app):
+            application_iter = app(environ, start_response)
+            try:
+                for data in application_iter:
+                    write(data)
+                if not state["sent"]:
+                    write(b"")
+                if state["chunked"]:
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+            finally:
+                if hasattr(application_iter, "close"):
+                    application_iter.close()
+
+        try:
+            execute(self.server.app)
+        except (ConnectionError, socket.timeout) as e:
+            self.close_connection = True
+            self.connection_dropped(e, environ)
+        except Exception:
+            # A response cut short can't be told apart from a complete one on this connection
+            self.close_connection = True
+            self.log_error("Error on request:\n%s", traceback.format_exc())
+            if not state["sent"]:
+                state["status"] = None
+                try:
+                    execute(InternalServerError())
+                except Exception:
+                    pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug WSGI server that serves requests on a fixed pool of threads.
+
+    The accept loop only queues connections. A bounded queue feeds the
+    worker threads, so a slow apply or diff ties up one worker while
+    status and list calls keep being served by the others, and a flood
+    of connections is answered with 503 instead of piling up. Between
+    requests, keep-alive connections wait in a selector rather than on a
+    worker and are closed after keepalive_timeout seconds of silence.
+    Event streams stay open as long as a page does, so they get threads
+    of their own, at most max_streams of them, instead of pool workers.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, max_streams=DEFAULT_MAX_STREAMS):
+        super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+        self.keepalive_timeout = keepalive_timeout
+        self.connections = queue.Queue(maxsize=queue_size)
+        self._streams = threading.BoundedSemaphore(max(1, int(max_streams)))
+        self._closing = False
+        self._selector = selectors.DefaultSelector()
+        # socket -> (client address, idle deadline)
+        self._parked = {}
+        self._parked_lock = threading.Lock()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._selector.register(self._wake_recv, selectors.EVENT_READ)
+
+        self._threads = [threading.Thread(target=self._watch, name="glfs-http-keepalive", daemon=True)]
+        for index in range(max(1, int(workers))):
+            self._threads.append(threading.Thread(target=self._work, name=f"glfs-http-{index}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.connections.put_nowait((request, client_address))
+        except queue.Full:
+            rejected_connections.inc()
+            self._reject(request)
+
+    def _reject(self, request):
+        try:
+            request.sendall(BUSY_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _work(self):
+        while True:
+            item = self.connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            except Exception:
+                self.handle_error(request, client_address)
+                self.shutdown_request(request)
+                continue
+            if handler.handed_off:
+                continue
+            if handler.close_connection or self._closing:
+                self.shutdown_request(request)
+            else:
+                self._park(request, client_address)
+
+    def start_stream(self, handler):
+        """Serve a parsed event-stream request on a thread of its own; False if at the limit"""
+        if not self._streams.acquire(blocking=False):
+            rejected_connections.inc()
+            handler.wfile.write(BUSY_RESPONSE)
+            handler.close_connection = True
+            return False
+        thread = threading.Thread(target=self._stream, args=(handler,), name="glfs-http-stream", daemon=True)
+        thread.start()
+        return True
+
+    def _stream(self, handler):
+        try:
+            handler.close_connection = True
+            try:
+                handler.run_wsgi()
+            except (ConnectionError, socket.timeout) as e:
+                handler.connection_dropped(e)
+            except Exception:
+                self.handle_error(handler.request, handler.client_address)
+            try:
+                WSGIRequestHandler.finish(handler)
+            except OSError:
+                pass
+        finally:
+            self._streams.release()
+            self.shutdown_request(handler.request)
+
+    def _park(self, request, client_address):
+        with self._parked_lock:
+            self._parked[request] = (client_address, time.monotonic() + self.keepalive_timeout)
+            self._selector.register(request, selectors.EVENT_READ)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_send.send(b'\0')
+        except OSError:
+            pass
+
+    def _watch(self):
+        """Hand parked connections back to the workers once the client speaks again"""
+        while not self._closing:
+            ready = self._selector.select(timeout=1.0)
+            for key, _ in ready:
+                if key.fileobj is self._wake_recv:
+                    try:
+                        while self._wake_recv.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                with self._parked_lock:
+                    parked = self._parked.pop(key.fileobj, None)
+                    self._selector.unregister(key.fileobj)
+                if parked is not None:
+                    self.process_request(key.fileobj, parked[0])
+            now = time.monotonic()
+            with self._parked_lock:
+                expired = [request for request, (_, deadline) in self._parked.items() if deadline <= now]
+                for request in expired:
+                    del self._parked[request]
+                    self._selector.unregister(request)
+            for request in expired:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        self._closing = True
+        super().server_close()
+        self._wake()
+        for _ in self._threads[1:]:
+            self.connections.put(None)
+        with self._parked_lock:
+            parked = list(self._parked)
+            self._parked.clear()
+        for request in parked:
+            self.shutdown_request(request)
+
+
+def server_options(config):
+    """Read the server's tuning options from the configuration"""
+    return {
+        "workers": config.get("server_workers", DEFAULT_WORKERS),
+        "queue_size": config.get("server_queue_size", DEFAULT_QUEUE_SIZE),
+        "keepalive_timeout": config.get("server_keepalive_timeout", DEFAULT_KEEPALIVE_TIMEOUT),
+        "max_streams": config.get("server_max_streams", DEFAULT_MAX_STREAMS),
+    }
+
+
+def make_server(app, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Create a pooled server bound to host and port (0 picks a free port)"""
+    return PooledWSGIServer(host, port, app, **options)
+
+
+def serve(app, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Serve app in the current thread until interrupted"""
+    server = make_server(app, host, port, **options)
+    print(f"Serving GLFS on http://{host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve_in_background(app, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Start serving app on a daemon thread; returns the server, whose server_port is bound"""
+    server = make_server(app, host, port, **options)
+    thread = threading.Thread(target=server.serve_forever, name="glfs-http-accept", daemon=True)
+    thread.start()
+    return server
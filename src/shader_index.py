@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import uuid
+import sqlite3
+import datetime
+import threading
+
+# File types listed in the shader library
+SHADER_EXTENSIONS = ('.glsl', '.hlsl', '.shader', '.mcpack', '.bin')
+
+# Bump when the table layout changes; the index is a cache and is rebuilt
+SCHEMA_VERSION = 2
+
+# Sort orders accepted by ShaderIndex.query
+SORT_KEYS = {
+    "name": lambda entry: entry["name"].casefold(),
+    "size": lambda entry: entry["size"],
+    "modified": lambda entry: entry["mtime_ns"],
+}
+
+SCHEMA = """
+DROP TABLE IF EXISTS dirs;
+DROP TABLE IF EXISTS entries;
+DROP TABLE IF EXISTS meta;
+CREATE TABLE dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE entries (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX entries_dir ON entries (dir);
+CREATE TABLE meta (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (path, kind)
+);
+"""
+
+
+def format_mtime(mtime_ns):
+    """Format a nanosecond mtime the way the shader list displays it"""
+    return datetime.datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ShaderIndex:
+    """Persistent index of the shader library, refreshed incrementally from stat data"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.generation = 0
+        # Distinguishes generations of this process from those of earlier runs
+        self.instance = uuid.uuid4().hex
+        self._conn = None
+        self._lock = threading.RLock()
+        # directory -> (mtime_ns, [entry, ...]) for answering without touching SQLite
+        self._memory = {}
+        # (kind, extensions, func) metadata extractors run on new or changed files
+        self._extractors = []
+        # (directory, sort) -> (entries list it was built from, sorted entries)
+        self._views = {}
+
+    def register_extractor(self, kind, extensions, func):
+        """Attach per-file metadata to entries with the given extensions.
+
+        func(path) is called once per (path, size, mtime); its JSON-serializable
+        result is stored in the index and returned under entry[kind].
+        """
+        with self._lock:
+            self._extractors.append((kind, tuple(extensions), func))
+            self._memory.clear()
+            self._views.clear()
+
+    def _connect(self):
+        """Open the index database, rebuilding it if the schema is outdated"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript(SCHEMA)
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load_entries(self, conn, directory):
+        """Load the indexed entries of a directory with their metadata"""
+        rows = conn.execute(
+            "SELECT path, name, size, mtime_ns FROM entries WHERE dir = ? ORDER BY name",
+            (directory,)
+        ).fetchall()
+        meta = {}
+        for path, kind, data in conn.execute(
+            "SELECT meta.path, meta.kind, meta.data FROM meta "
+            "JOIN entries ON entries.path = meta.path WHERE entries.dir = ?",
+            (directory,)
+        ):
+            meta.setdefault(path, {})[kind] = json.loads(data)
+        entries = []
+        extracted = []
+        for path, name, size, mtime_ns in rows:
+            entry = self._entry(path, name, size, mtime_ns)
+            known = meta.get(path, {})
+            for kind, extensions, func in self._extractors:
+                if not name.endswith(extensions):
+                    continue
+                if kind in known:
+                    entry[kind] = known[kind]
+                else:
+                    # New or changed file, or an extractor added since it was indexed
+                    entry[kind] = self._extract(kind, func, path)
+                    extracted.append((path, kind, json.dumps(entry[kind])))
+            entries.append(entry)
+        if extracted:
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?, ?)", extracted)
+            conn.commit()
+        return entries
+
+    def _extract(self, kind, func, path):
+        """Run a metadata extractor on one file"""
+        try:
+            return func(path)
+        except Exception as e:
+            print(f"Failed to extract {kind} from {path}: {e}", file=sys.stderr)
+            return None
+
+    def _entry(self, path, name, size, mtime_ns):
+        return {
+            "name": name,
+            "path": path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "modified": format_mtime(mtime_ns)
+        }
+
+    def scan(self, directory, force=False):
+        """Return the shader entries of a directory, rescanning only what changed.
+
+        The directory listing is skipped entirely while the directory's own mtime
+        is unchanged; pass force=True to pick up files modified in place.
+        """
+        directory = os.path.normpath(directory)
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+
+        with self._lock:
+            cached = self._memory.get(directory)
+            if cached and cached[0] == dir_mtime and not force:
+                return cached[1]
+
+            conn = self._connect()
+            row = conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (directory,)).fetchone()
+            if row and row[0] == dir_mtime and not force:
+                entries = self._load_entries(conn, directory)
+                self._memory[directory] = (dir_mtime, entries)
+                return entries
+
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in conn.execute(
+                    "SELECT path, size, mtime_ns FROM entries WHERE dir = ?", (directory,)
+                )
+            }
+            changed = []
+            seen = set()
+            with os.scandir(directory) as it:
+                for item in it:
+                    if not item.name.endswith(SHADER_EXTENSIONS):
+                        continue
+                    try:
+                        if not item.is_file():
+                            continue
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    path = os.path.join(directory, item.name)
+                    seen.add(path)
+                    if known.get(path) != (st.st_size, st.st_mtime_ns):
+                        changed.append((path, directory, item.name, st.st_size, st.st_mtime_ns))
+            removed = [(path,) for path in known if path not in seen]
+
+            conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", changed)
+            conn.executemany("DELETE FROM meta WHERE path = ?", [(row[0],) for row in changed])
+            conn.executemany("DELETE FROM entries WHERE path = ?", removed)
+            conn.executemany("DELETE FROM meta WHERE path = ?", removed)
+            conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (directory, dir_mtime))
+            conn.commit()
+            if changed or removed:
+                self.generation += 1
+
+            entries = self._load_entries(conn, directory)
+            self._memory[directory] = (dir_mtime, entries)
+            return entries
+
+    def query(self, directory, sort="name", q=None, offset=0, limit=None, force=False):
+        """Return one page of a directory's entries, sorted and filtered.
+
+        sort is a key of SORT_KEYS, optionally prefixed with "-" for
+        descending order. q is a case-insensitive substring matched against
+        the file name and pack name. Sorted views are cached until the
+        directory's entries change. Returns (total, items).
+        """
+        descending = sort.startswith("-")
+        key = sort.lstrip("-")
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {sort}")
+
+        entries = self.scan(directory, force=force)
+        view_key = (os.path.normpath(directory), sort)
+        with self._lock:
+            cached = self._views.get(view_key)
+            if cached is None or cached[0] is not entries:
+                ordered = sorted(entries, key=SORT_KEYS[key], reverse=descending)
+                cached = (entries, ordered)
+                self._views[view_key] = cached
+        ordered = cached[1]
+
+        if q:
+            needle = q.casefold()
+            ordered = [entry for entry in ordered if needle in entry["name"].casefold()
+                       or needle in ((entry.get("manifest") or {}).get("name") or "").casefold()]
+        end = None if limit is None else offset + limit
+        return len(ordered), ordered[offset:end]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._memory.clear()
+            self._views.clear()
@@ -0,0 +1,352 @@
+import os
+import sys
+import json
+import lzma
+import time
+import uuid
+import zlib
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config_store import write_json_atomic, file_lock
+from src.material_bin import MaterialBin
+
+# Largest chunk; files unchanged since the last snapshot are not re-read at all
+CHUNK_SIZE = 256 * 1024
+
+# Chunks of a material.bin end at a section boundary once they hold this much
+MIN_CHUNK_SIZE = 32 * 1024
+
+# A section ends a chunk when its CRC32 has these bits clear, about one in four
+CUT_MASK = 0x3
+
+# Compression threads; zlib and lzma release the GIL
+DEFAULT_WORKERS = 4
+
+# One-byte tag at the start of every stored chunk
+CODECS = {
+    "zlib": (b'z', lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (b'x', lambda data: lzma.compress(data, preset=6), lzma.decompress),
+    "raw": (b'r', bytes, bytes),
+}
+_DECODERS = {tag: decode for tag, _, decode in CODECS.values()}
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing or its chunks are damaged"""
+
+
+def section_boundaries(path, size):
+    """Offsets inside a material.bin where passes and shader stages start and end.
+
+    Returns an empty set for anything that isn't a readable material.
+    """
+    if not size or not path.endswith('.bin'):
+        return set()
+    offsets = set()
+    try:
+        with MaterialBin.open(path) as material:
+            for material_pass in material.passes:
+                offsets.update((material_pass["offset"], material_pass["end"]))
+                for variant in material_pass["variants"]:
+                    for stage in variant["stages"]:
+                        offsets.update((stage["offset"], stage["offset"] + stage["size"]))
+    except (OSError, ValueError):
+        return set()
+    return {offset for offset in offsets if 0 < offset < size}
+
+
+class SnapshotStore:
+    """Deduplicated, compressed snapshots of a folder such as renderer/materials.
+
+    Files are split into chunks named by their SHA-256 and each unique
+    chunk is stored once, compressed, under chunks/. A snapshot is a JSON
+    manifest listing every file's size, mtime and chunk hashes. Chunks of
+    a material.bin only end where a pass or shader stage does, and which
+    of those boundaries ends a chunk depends on the content before it, so
+    a shader that grows or shrinks only changes the chunks around it and
+    a snapshot after a minor game update stores little more than the
+    changed shaders. Other files are cut at fixed offsets, so an insertion
+    there changes every later chunk. Files whose size and mtime match the
+    previous snapshot of the same folder reuse its chunk list without
+    being read.
+
+    Taking snapshots and collecting garbage hold a lock file in the store,
+    so a gc in another process never removes chunks a snapshot in progress
+    is about to refer to.
+    """
+
+    def __init__(self, root, chunk_size=CHUNK_SIZE, codec="zlib", workers=DEFAULT_WORKERS):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        self.root = root
+        self.chunk_size = chunk_size
+        self.codec = codec
+        self.workers = workers
+        self.chunks_dir = os.path.join(root, 'chunks')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self.lock_path = os.path.join(root, '.lock')
+        self._lock = threading.Lock()
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def manifest_path(self, snapshot_id):
+        if not snapshot_id or os.path.basename(snapshot_id) != snapshot_id:
+            raise SnapshotError(f"Invalid snapshot id: {snapshot_id}")
+        return os.path.join(self.manifests_dir, snapshot_id + '.json')
+
+    def _store_chunk(self, digest, data):
+        """Write a chunk unless it is already stored; returns the bytes written"""
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return 0
+        tag, encode, _ = CODECS[self.codec]
+        payload = encode(data)
+        if len(payload) >= len(data):
+            tag, payload = CODECS["raw"][0], data
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        with open(tmp, 'wb') as f:
+            f.write(tag)
+            f.write(payload)
+        os.replace(tmp, path)
+        return len(payload) + 1
+
+    def read_chunk(self, digest):
+        """Load and verify one chunk"""
+        try:
+            with open(self.chunk_path(digest), 'rb') as f:
+                tag = f.read(1)
+                payload = f.read()
+        except OSError as e:
+            raise SnapshotError(f"Missing chunk {digest}: {e}")
+        decode = _DECODERS.get(tag)
+        if decode is None:
+            raise SnapshotError(f"Unknown encoding in chunk {digest}")
+        data = decode(payload)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise SnapshotError(f"Chunk {digest} is damaged")
+        return data
+
+    def _chunk_file(self, path, progress):
+        """Hash and store a file's chunks; returns (chunk hashes, bytes stored)"""
+        digests = []
+        stored = 0
+        pending = []
+        pending_size = 0
+
+        def flush():
+            nonlocal stored, pending_size
+            if pending:
+                data = b''.join(pending)
+                digest = hashlib.sha256(data).hexdigest()
+                stored += self._store_chunk(digest, data)
+                digests.append(digest)
+                pending.clear()
+                pending_size = 0
+
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            start = 0
+            for cut in sorted(section_boundaries(path, size) | {size}):
+                while start < cut:
+                    data = f.read(min(self.chunk_size, cut - start))
+                    if not data:
+                        break
+                    start += len(data)
+                    if pending_size + len(data) > self.chunk_size:
+                        flush()
+                    pending.append(data)
+                    pending_size += len(data)
+                    if pending_size >= MIN_CHUNK_SIZE and zlib.crc32(data) & CUT_MASK == 0:
+                        flush()
+                    progress(len(data))
+            flush()
+        return digests, stored
+
+    def latest(self, source_dir):
+        """Get the newest snapshot manifest taken of a folder, or None"""
+        source = os.path.normcase(os.path.abspath(source_dir))
+        for summary in self.list():
+            if summary["source"] == source:
+                return self.get(summary["id"])
+        return None
+
+    def _scan(self, source):
+        """Map relative paths under source to (path, size, mtime_ns)"""
+        files = {}
+        for directory, _, names in os.walk(source):
+            for name in names:
+                path = os.path.join(directory, name)
+                st = os.stat(path)
+                files[os.path.relpath(path, source).replace(os.sep, '/')] = (path, st.st_size, st.st_mtime_ns)
+        return files
+
+    def is_current(self, source_dir):
+        """Check whether the newest snapshot of a folder still matches it by size and mtime"""
+        previous = self.latest(source_dir)
+        if previous is None:
+            return False
+        files = self._scan(os.path.normcase(os.path.abspath(source_dir)))
+        return files.keys() == previous["files"].keys() and all(
+            (entry["size"], entry["mtime_ns"]) == files[rel][1:] for rel, entry in previous["files"].items())
+
+    def create(self, source_dir, label=None, progress=None):
+        """Snapshot every file under source_dir; returns the snapshot summary"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, file_lock(self.lock_path, timeout=None):
+            return self._create(source_dir, label, progress)
+
+    def _create(self, source_dir, label, progress):
+        source = os.path.normcase(os.path.abspath(source_dir))
+        if not os.path.isdir(source):
+            raise SnapshotError(f"Folder not found: {source_dir}")
+        previous = self.latest(source)
+        previous_files = previous["files"] if previous else {}
+        files = self._scan(source)
+
+        entries = {}
+        to_read = []
+        for rel, (path, size, mtime_ns) in files.items():
+            old = previous_files.get(rel)
+            if old and old["size"] == size and old["mtime_ns"] == mtime_ns \
+                    and all(os.path.exists(self.chunk_path(digest)) for digest in old["chunks"]):
+                entries[rel] = old
+            else:
+                to_read.append(rel)
+
+        total = sum(files[rel][1] for rel in to_read)
+        done = [0]
+        done_lock = threading.Lock()
+
+        def advance(count):
+            with done_lock:
+                done[0] += count
+                current = done[0]
+            if progress:
+                progress(current, total)
+
+        if progress:
+            progress(0, total)
+        stored = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {rel: pool.submit(self._chunk_file, files[rel][0], advance) for rel in to_read}
+            for rel, future in futures.items():
+                digests, written = future.result()
+                stored += written
+                _, size, mtime_ns = files[rel]
+                entries[rel] = {"size": size, "mtime_ns": mtime_ns, "chunks": digests}
+
+        snapshot_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        manifest = {
+            "id": snapshot_id,
+            "label": label or "",
+            "source": source,
+            "created": time.time(),
+            "chunk_size": self.chunk_size,
+            "files": dict(sorted(entries.items()))
+        }
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        write_json_atomic(self.manifest_path(snapshot_id), manifest)
+        summary = self._summary(manifest)
+        summary.update({"read_files": len(to_read), "read_bytes": total, "stored_bytes": stored})
+        return summary
+
+    def _summary(self, manifest):
+        return {
+            "id": manifest["id"],
+            "label": manifest["label"],
+            "source": manifest["source"],
+            "created": manifest["created"],
+            "files": len(manifest["files"]),
+            "bytes": sum(entry["size"] for entry in manifest["files"].values())
+        }
+
+    def get(self, snapshot_id):
+        """Load a snapshot manifest"""
+        try:
+            with open(self.manifest_path(snapshot_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Snapshot {snapshot_id} not found: {e}")
+
+    def list(self):
+        """Summarize all snapshots, newest first"""
+        summaries = []
+        if not os.path.isdir(self.manifests_dir):
+            return summaries
+        for name in os.listdir(self.manifests_dir):
+            if name.endswith('.json'):
+                try:
+                    summaries.append(self._summary(self.get(name[:-5])))
+                except SnapshotError as e:
+                    print(f"Skipping snapshot {name}: {e}", file=sys.stderr)
+        summaries.sort(key=lambda summary: summary["created"], reverse=True)
+        return summaries
+
+    def restore(self, snapshot_id, dest_dir=None, progress=None):
+        """Stream a snapshot's files back into dest_dir (its source folder by default).
+
+        Each file is rebuilt beside its target and renamed over it, so a
+        failed restore never leaves a half-written material.bin behind.
+        """
+        manifest = self.get(snapshot_id)
+        dest_dir = dest_dir or manifest["source"]
+        total = sum(entry["size"] for entry in manifest["files"].values())
+        done = 0
+        if progress:
+            progress(0, total)
+        for rel, entry in manifest["files"].items():
+            target = os.path.normpath(os.path.join(dest_dir, *rel.split('/')))
+            if not target.startswith(os.path.normpath(dest_dir) + os.sep):
+                raise SnapshotError(f"Unsafe path in snapshot: {rel}")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            staged = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.glfs-stage")
+            try:
+                with open(staged, 'wb') as f:
+                    for digest in entry["chunks"]:
+                        data = self.read_chunk(digest)
+                        f.write(data)
+                        done += len(data)
+                        if progress:
+                            progress(done, total)
+                os.replace(staged, target)
+            except BaseException:
+                if os.path.exists(staged):
+                    os.remove(staged)
+                raise
+        return {"files": len(manifest["files"]), "bytes": total}
+
+    def delete(self, snapshot_id):
+        """Delete a snapshot's manifest; run gc() to free its chunks"""
+        try:
+            os.remove(self.manifest_path(snapshot_id))
+        except FileNotFoundError:
+            raise SnapshotError(f"Snapshot {snapshot_id} not found")
+
+    def gc(self):
+        """Remove chunks no snapshot refers to; returns the bytes freed"""
+        if not os.path.isdir(self.root):
+            return 0
+        with self._lock, file_lock(self.lock_path, timeout=None):
+            referenced = set()
+            for summary in self.list():
+                for entry in self.get(summary["id"])["files"].values():
+                    referenced.update(entry["chunks"])
+            freed = 0
+            if not os.path.isdir(self.chunks_dir):
+                return freed
+            for bucket in os.scandir(self.chunks_dir):
+                if not bucket.is_dir():
+                    continue
+                for chunk in os.scandir(bucket.path):
+                    if chunk.name not in referenced and '.tmp-' not in chunk.name:
+                        freed += chunk.stat().st_size
+                        os.remove(chunk.path)
+                try:
+                    os.rmdir(bucket.path)
+                except OSError:
+                    pass
+            return freed
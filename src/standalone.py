@@ -3,13 +3,18 @@ import sys
 import json
 import shutil
 import datetime
-import subprocess
 import webbrowser
 from pathlib import Path
-import webview
 import threading
-import tkinter as tk
-from tkinter import filedialog
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.blob_store import BlobStore
+from src.config_store import ConfigStore
+from src.platforms import get_platform
+from src.global_packs import GlobalPackStack, read_pack_header
+from src.preset_slots import ACTIVE_PACK_DIR, slots_for
 
 # Configuration
 CONFIG_FILE = 'config.json'
@@ -19,37 +24,24 @@ DEFAULT_CONFIG = {
     "brd_path": "",
     "theme": "dark",
     "last_used_shader": "",
-    "presets": {}
+    "presets": {},
+    "preset_slots": 3,
+    "preset_slot_budget_mb": 2048
 }
 
 class GLFSApp:
     def __init__(self):
+        self.config_store = ConfigStore(CONFIG_FILE, DEFAULT_CONFIG)
         self.config = self.load_config()
         self.window = None
         
     def load_config(self):
         """Load configuration from config file"""
-        config_path = Path(CONFIG_FILE)
-        if config_path.exists():
-            try:
-                with open(config_path, "r") as f:
-                    loaded_config = json.load(f)
-                    config = DEFAULT_CONFIG.copy()
-                    config.update(loaded_config)
-                    return config
-            except Exception as e:
-                print(f"Failed to load configuration: {e}")
-        return DEFAULT_CONFIG.copy()
+        return self.config_store.load()
     
     def save_config(self):
         """Save configuration to config file"""
-        try:
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(self.config, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Failed to save configuration: {e}")
-            return False
+        return self.config_store.save(self.config)
     
     # API exposed to JavaScript
     def get_config(self):
@@ -92,7 +84,7 @@ class GLFSApp:
                     if os.path.isfile(item_path) and item.endswith((".glsl", ".hlsl", ".shader")):
                         shaders.append(item)
             except Exception as e:
-                print(f"Error listing shaders: {e}")
+                print(f"Error listing shaders: {e}", file=sys.stderr)
         
         return {"shaders": shaders}
     
@@ -155,6 +147,23 @@ class GLFSApp:
         
         shader_name = self.config["presets"][preset_name]
         
+        # Packs switch through a warm slot beside the active pack folder
+        shader_path = os.path.join(self.config["shaders_path"] or "", shader_name)
+        if shader_name.endswith(".mcpack") and os.path.isfile(shader_path):
+            try:
+                resource_packs_dir = get_platform().resource_packs_dir()
+                slots = slots_for(resource_packs_dir, self.config.get("preset_slots", 3),
+                                  self.config.get("preset_slot_budget_mb", 2048))
+                replaced = read_pack_header(os.path.join(resource_packs_dir, ACTIVE_PACK_DIR))
+                result = slots.activate(shader_path)
+                GlobalPackStack.for_resource_packs(resource_packs_dir).enable(
+                    [ACTIVE_PACK_DIR], [replaced[0]] if replaced else ())
+            except Exception as e:
+                return {"status": "error", "message": f"Error applying shader: {e}"}
+            self.config["last_used_shader"] = shader_name
+            self.save_config()
+            return {"status": "ok", "message": f"Preset {preset_name} applied", "mode": result["mode"]}
+        
         # Apply the shader
         return self.apply_shader(shader_name)
     
@@ -266,23 +275,13 @@ class GLFSApp:
     def launch_minecraft(self):
         """Launch Minecraft for JavaScript"""
         try:
-            # Try to launch Minecraft via the Microsoft Store protocol
-            subprocess.Popen(["start", "minecraft://"], shell=True)
-            return {"status": "ok", "message": "Launching Minecraft..."}
+            return get_platform().launch_minecraft()
         except Exception as e:
             return {"status": "error", "message": f"Error launching Minecraft: {e}"}
     
     def browse_directory(self, title="Select Directory"):
         """Open a directory browser dialog"""
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        
-        directory = filedialog.askdirectory(title=title)
-        root.destroy()
-        
-        if directory:
-            return directory
-        return ""
+        return get_platform().ask_directory(title=title)
     
     def browse_minecraft_path(self):
         """Browse for Minecraft path"""
@@ -313,14 +312,10 @@ class GLFSApp:
     
     def import_shader(self):
         """Import a shader file"""
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        
-        file_path = filedialog.askopenfilename(
+        file_path = get_platform().ask_open_file(
             title="Select Shader File",
             filetypes=[("Shader Files", "*.glsl;*.hlsl;*.shader"), ("All Files", "*.*")]
         )
-        root.destroy()
         
         if not file_path:
             return {"status": "cancelled"}
@@ -329,49 +324,27 @@ class GLFSApp:
             return {"status": "error", "message": "Shaders path not set or invalid"}
         
         try:
-            # Copy the shader to the shaders directory
+            # Add the shader to the library's content store and link it into place
             shader_name = os.path.basename(file_path)
             dest_path = os.path.join(self.config["shaders_path"], shader_name)
             
-            shutil.copy2(file_path, dest_path)
+            result = BlobStore.for_library(self.config["shaders_path"]).import_file(file_path, dest_path)
             
-            return {"status": "ok", "message": f"Shader {shader_name} imported successfully", "shader": shader_name}
+            return {
+                "status": "ok",
+                "message": f"Shader {shader_name} imported successfully",
+                "shader": shader_name,
+                "deduplicated": result["deduplicated"]
+            }
         except Exception as e:
             return {"status": "error", "message": f"Error importing shader: {e}"}
     
     def detect_minecraft_path(self):
         """Auto-detect Minecraft Bedrock installation path"""
         try:
-            import winreg
-            # Method 1: Try to find via Windows Registry
-            try:
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Explorer\User Shell Folders") as key:
-                    local_app_data = winreg.QueryValueEx(key, "Local AppData")[0]
-                    
-                # Check for Minecraft UWP app
-                mc_path = os.path.join(os.path.expandvars(local_app_data), "Packages")
-                if os.path.exists(mc_path):
-                    for folder in os.listdir(mc_path):
-                        if folder.startswith("Microsoft.MinecraftUWP"):
-                            mc_uwp_path = os.path.join(mc_path, folder, "LocalState", "games", "com.mojang")
-                            if os.path.exists(mc_uwp_path):
-                                return mc_uwp_path
-            except Exception as e:
-                print(f"Registry detection failed: {e}")
-                
-            # Method 2: Try common installation paths
-            common_paths = [
-                os.path.expandvars("%LOCALAPPDATA%\\Packages\\Microsoft.MinecraftUWP_8wekyb3d8bbwe\\LocalState\\games\\com.mojang"),
-                os.path.expanduser("~\\AppData\\Local\\Packages\\Microsoft.MinecraftUWP_8wekyb3d8bbwe\\LocalState\\games\\com.mojang")
-            ]
-            
-            for path in common_paths:
-                if os.path.exists(path):
-                    return path
-                    
-            return ""
+            return get_platform().detect_com_mojang_path()
         except Exception as e:
-            print(f"Error detecting Minecraft path: {e}")
+            print(f"Error detecting Minecraft path: {e}", file=sys.stderr)
             return ""
     
     def set_default_shaders_path(self):
@@ -391,11 +364,13 @@ class GLFSApp:
                 
                 return shaders_dir
             except Exception as e:
-                print(f"Error creating shaders directory: {e}")
+                print(f"Error creating shaders directory: {e}", file=sys.stderr)
         return ""
     
     def start(self):
         """Start the application"""
+        import webview
+        
         html_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates', 'standalone.html'))
         
         # Create window
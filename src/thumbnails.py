@@ -0,0 +1,156 @@
+import io
+import os
+import sys
+import re
+import uuid
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.mcpack_meta import find_manifest
+
+ICON_NAME = 'pack_icon.png'
+
+# Thumbnail edge in pixels; twice the list's icon size for high-DPI screens
+THUMBNAIL_SIZE = 96
+
+# Icons larger than this are not decoded
+MAX_ICON_BYTES = 8 * 1024 * 1024
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_ICON_ID_RE = re.compile(r'^[0-9a-f]{16}$')
+
+
+def find_icon(names):
+    """Pick the pack_icon.png beside the manifest, else the top-most one"""
+    manifest = find_manifest(names)
+    if manifest is not None:
+        beside = manifest[:-len('manifest.json')] + ICON_NAME
+        if beside in names:
+            return beside
+    candidates = [n for n in names if n == ICON_NAME or n.endswith('/' + ICON_NAME)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda n: n.count('/'))
+
+
+def read_icon_info(pack_path):
+    """Identify an .mcpack's icon by the CRC and size in its zip entry.
+
+    Only the central directory is read. The id changes whenever the icon's
+    content does, so it doubles as the thumbnail cache key. Returns None if
+    the pack has no icon.
+    """
+    try:
+        with zipfile.ZipFile(pack_path) as zf:
+            name = find_icon(zf.namelist())
+            if name is None:
+                return None
+            info = zf.getinfo(name)
+    except (OSError, zipfile.BadZipFile, KeyError) as e:
+        print(f"Failed to read icon of {pack_path}: {e}", file=sys.stderr)
+        return None
+    return {"id": f"{info.CRC:08x}{info.file_size:08x}"}
+
+
+def is_icon_id(icon_id):
+    return bool(_ICON_ID_RE.match(icon_id or ''))
+
+
+class ThumbnailCache:
+    """Size-bounded on-disk cache of pack icon thumbnails.
+
+    Thumbnails are generated on a small thread pool and evicted least
+    recently used first (by file mtime, refreshed on every hit) once the
+    cache grows past max_bytes. Without Pillow the icon is cached as is.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES, size=THUMBNAIL_SIZE, workers=2):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="glfs-thumb")
+        self._pending = {}
+        self._total = None
+        self._lock = threading.Lock()
+
+    def path_for(self, icon_id):
+        return os.path.join(self.root, f"{icon_id}-{self.size}.png")
+
+    def get(self, icon_id):
+        """Get a cached thumbnail's path, or None"""
+        path = self.path_for(icon_id)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def request(self, icon_id, pack_path):
+        """Generate a thumbnail in the background unless cached; returns a future or None"""
+        if os.path.exists(self.path_for(icon_id)):
+            return None
+        with self._lock:
+            future = self._pending.get(icon_id)
+            if future is None:
+                future = self._pending[icon_id] = self._pool.submit(self._generate, icon_id, pack_path)
+                future.add_done_callback(lambda _: self._finish(icon_id))
+            return future
+
+    def _finish(self, icon_id):
+        with self._lock:
+            self._pending.pop(icon_id, None)
+
+    def _render(self, data):
+        # Pillow is only loaded once an icon is rendered, keeping it out of the CLI's startup
+        try:
+            from PIL import Image
+        except ImportError:
+            return data
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((self.size, self.size), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format='PNG', optimize=True)
+            return out.getvalue()
+
+    def _generate(self, icon_id, pack_path):
+        with zipfile.ZipFile(pack_path) as zf:
+            name = find_icon(zf.namelist())
+            if name is None:
+                raise ValueError("Pack has no icon")
+            info = zf.getinfo(name)
+            if info.file_size > MAX_ICON_BYTES:
+                raise ValueError("Pack icon is too large")
+            data = zf.read(info)
+        png = self._render(data)
+
+        path = self.path_for(icon_id)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        with open(tmp, 'wb') as f:
+            f.write(png)
+        os.replace(tmp, path)
+        self._added(len(png))
+        return path
+
+    def _added(self, count):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(entry.stat().st_size for entry in os.scandir(self.root)
+                                  if entry.name.endswith('.png'))
+            else:
+                self._total += count
+            if self._total <= self.max_bytes:
+                return
+            entries = sorted((entry for entry in os.scandir(self.root) if entry.name.endswith('.png')),
+                             key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    self._total -= size
+                except OSError:
+                    pass
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import sqlite3
+import zipfile
+import threading
+
+from src.mcpack_meta import MANIFEST_NAME, find_manifest, parse_manifest
+
+# Bump when the table layout changes; the index is a cache and is rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+DROP TABLE IF EXISTS roots;
+DROP TABLE IF EXISTS packs;
+CREATE TABLE roots (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE packs (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    uuids TEXT NOT NULL
+);
+CREATE INDEX packs_root ON packs (root);
+"""
+
+
+def manifest_uuids(manifest):
+    """List a manifest's (kind, uuid) pairs: the header's, then each module's"""
+    if not isinstance(manifest, dict):
+        return []
+    uuids = []
+    header = manifest.get("header")
+    if isinstance(header, dict) and header.get("uuid"):
+        uuids.append(("header", str(header["uuid"]).lower()))
+    modules = manifest.get("modules")
+    for module in modules if isinstance(modules, list) else []:
+        if isinstance(module, dict) and module.get("uuid"):
+            uuids.append(("module", str(module["uuid"]).lower()))
+    return uuids
+
+
+def read_pack_uuids(pack_path):
+    """Read the header and module UUIDs of an .mcpack, or [] if it has no readable manifest"""
+    try:
+        with zipfile.ZipFile(pack_path) as zf:
+            name = find_manifest(zf.namelist())
+            if name is None:
+                return []
+            return manifest_uuids(parse_manifest(zf.read(name)))
+    except (OSError, ValueError, zipfile.BadZipFile, KeyError) as e:
+        print(f"Failed to read manifest of {pack_path}: {e}", file=sys.stderr)
+        return []
+
+
+def _read_dir_uuids(pack_dir):
+    try:
+        with open(os.path.join(pack_dir, MANIFEST_NAME), 'rb') as f:
+            return manifest_uuids(parse_manifest(f.read()))
+    except (OSError, ValueError) as e:
+        print(f"Failed to read manifest of {pack_dir}: {e}", file=sys.stderr)
+        return []
+
+
+class PackUuidIndex:
+    """Header and module UUIDs of every pack installed in resource pack folders.
+
+    A folder is only listed again when its own mtime changes, which covers
+    packs being added, removed or swapped in by rename, and within a listing
+    only packs whose manifest.json changed size or mtime are re-read. The
+    UUID -> packs map lives in memory, so checking a pack for conflicts is a
+    dictionary lookup per UUID. Callers that rewrite a pack in place, like
+    a delta install, call refresh_pack() for it.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.RLock()
+        self._roots = None
+        # pack dir -> (size, mtime_ns, [(kind, uuid), ...])
+        self._packs = None
+        # uuid -> {pack dir: kind}
+        self._owners = {}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript(SCHEMA)
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self):
+        if self._packs is not None:
+            return
+        conn = self._connect()
+        self._roots = dict(conn.execute("SELECT path, mtime_ns FROM roots"))
+        self._packs = {}
+        for path, size, mtime_ns, uuids in conn.execute("SELECT path, size, mtime_ns, uuids FROM packs"):
+            self._set(path, (size, mtime_ns, [tuple(pair) for pair in json.loads(uuids)]))
+
+    def _set(self, path, record):
+        self._unset(path)
+        self._packs[path] = record
+        for kind, value in record[2]:
+            self._owners.setdefault(value, {})[path] = kind
+
+    def _unset(self, path):
+        old = self._packs.pop(path, None)
+        if old is None:
+            return
+        for _, value in old[2]:
+            owners = self._owners.get(value)
+            if owners is not None:
+                owners.pop(path, None)
+                if not owners:
+                    del self._owners[value]
+
+    def _stat_manifest(self, pack_dir):
+        try:
+            st = os.stat(os.path.join(pack_dir, MANIFEST_NAME))
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def refresh(self, root, force=False):
+        """Bring a resource pack folder up to date; a no-op while its mtime is unchanged"""
+        root = os.path.normpath(root)
+        try:
+            root_mtime = os.stat(root).st_mtime_ns
+        except OSError:
+            root_mtime = None
+        with self._lock:
+            self._load()
+            if self._roots.get(root) == root_mtime and not force:
+                return False
+
+            known = {path for path, _ in self._items_under(root)}
+            seen = set()
+            changed = []
+            if root_mtime is not None:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        # Hidden folders hold GLFS's warm slots and staging, which the game ignores
+                        if entry.name.startswith('.') or not entry.is_dir():
+                            continue
+                        key = self._stat_manifest(entry.path)
+                        if key is None:
+                            continue
+                        path = os.path.normpath(entry.path)
+                        seen.add(path)
+                        record = self._packs.get(path)
+                        if record is None or record[:2] != key:
+                            changed.append((path, key))
+
+            conn = self._connect()
+            for path, key in changed:
+                self._set(path, (key[0], key[1], _read_dir_uuids(path)))
+                conn.execute("INSERT OR REPLACE INTO packs VALUES (?, ?, ?, ?, ?)",
+                             (path, root, key[0], key[1], json.dumps(self._packs[path][2])))
+            for path in known - seen:
+                self._unset(path)
+                conn.execute("DELETE FROM packs WHERE path = ?", (path,))
+            if root_mtime is None:
+                self._roots.pop(root, None)
+                conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+            else:
+                self._roots[root] = root_mtime
+                conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, root_mtime))
+            conn.commit()
+            return True
+
+    def _items_under(self, root):
+        return [(path, record) for path, record in self._packs.items()
+                if os.path.dirname(path) == root]
+
+    def refresh_pack(self, pack_dir):
+        """Re-read one pack whose manifest may have changed in place"""
+        path = os.path.normpath(pack_dir)
+        with self._lock:
+            self._load()
+            key = self._stat_manifest(path)
+            conn = self._connect()
+            if key is None:
+                self._unset(path)
+                conn.execute("DELETE FROM packs WHERE path = ?", (path,))
+            elif self._packs.get(path, (None, None))[:2] != key:
+                self._set(path, (key[0], key[1], _read_dir_uuids(path)))
+                conn.execute("INSERT OR REPLACE INTO packs VALUES (?, ?, ?, ?, ?)",
+                             (path, os.path.dirname(path), key[0], key[1], json.dumps(self._packs[path][2])))
+            conn.commit()
+
+    def find_conflicts(self, uuids, exclude=()):
+        """Report installed packs that already use any of these (kind, uuid) pairs"""
+        exclude = {os.path.normpath(path) for path in exclude}
+        conflicts = []
+        with self._lock:
+            self._load()
+            for kind, value in uuids:
+                owners = [path for path in self._owners.get(value, {}) if path not in exclude]
+                if owners:
+                    conflicts.append({"uuid": value, "kind": kind,
+                                      "packs": sorted(os.path.basename(path) for path in owners)})
+        return conflicts
+
+    def pack_uuids(self, pack_dir):
+        """Get the indexed (kind, uuid) pairs of an installed pack"""
+        with self._lock:
+            self._load()
+            record = self._packs.get(os.path.normpath(pack_dir))
+            return list(record[2]) if record else []
+
+    def all_conflicts(self):
+        """List every UUID used by more than one installed pack, or twice in one pack"""
+        with self._lock:
+            self._load()
+            conflicts = []
+            for value, owners in self._owners.items():
+                uses = sum(1 for path in owners for _, other in self._packs[path][2] if other == value)
+                if uses > 1:
+                    conflicts.append({"uuid": value, "packs": sorted(os.path.basename(path) for path in owners)})
+        conflicts.sort(key=lambda conflict: conflict["packs"])
+        return conflicts
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
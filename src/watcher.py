@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import queue
+import select
+import struct
+import threading
+
+# inotify event bits (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """Get libc's inotify functions, or None where inotify is unavailable"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def snapshot(directory):
+    """Map each file name in a directory to its (size, mtime_ns)"""
+    result = {}
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                try:
+                    if item.is_file():
+                        st = item.stat()
+                        result[item.name] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return result
+
+
+class DirectoryWatcher:
+    """Report file additions, removals and modifications in a set of directories.
+
+    Uses inotify on Linux and falls back to comparing os.scandir stat
+    snapshots every interval seconds. callback receives a list of deltas,
+    each {"type": "added"|"removed"|"modified", "dir": ..., "name": ..., "path": ...}.
+    """
+
+    def __init__(self, paths, callback, interval=1.0):
+        self.paths = [os.path.normpath(p) for p in paths]
+        self.callback = callback
+        self.interval = interval
+        self.backend = None
+        self._snapshots = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching in a background thread"""
+        for path in self.paths:
+            self._snapshots[path] = snapshot(path)
+        self._thread = threading.Thread(target=self._run, name="glfs-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+
+    def _emit(self, deltas):
+        if deltas:
+            try:
+                self.callback(deltas)
+            except Exception as e:
+                print(f"Error handling file changes: {e}", file=sys.stderr)
+
+    def _compare(self, directory, names=None):
+        """Diff a directory (or some of its names) against the last snapshot"""
+        old = self._snapshots.get(directory, {})
+        if names is None:
+            new = snapshot(directory)
+            names = set(old) | set(new)
+        else:
+            new = dict(old)
+            for name in names:
+                try:
+                    st = os.stat(os.path.join(directory, name))
+                    if os.path.isfile(os.path.join(directory, name)):
+                        new[name] = (st.st_size, st.st_mtime_ns)
+                    else:
+                        new.pop(name, None)
+                except OSError:
+                    new.pop(name, None)
+        self._snapshots[directory] = new
+
+        deltas = []
+        for name in sorted(names):
+            before, after = old.get(name), new.get(name)
+            if before == after:
+                continue
+            if before is None:
+                kind = "added"
+            elif after is None:
+                kind = "removed"
+            else:
+                kind = "modified"
+            deltas.append({"type": kind, "dir": directory, "name": name, "path": os.path.join(directory, name)})
+        return deltas
+
+    def _run(self):
+        libc = _load_inotify()
+        if libc is not None:
+            try:
+                self._run_inotify(libc)
+                return
+            except OSError as e:
+                print(f"inotify unavailable, polling instead: {e}", file=sys.stderr)
+        self._run_poll()
+
+    def _run_poll(self):
+        self.backend = "poll"
+        while not self._stop.wait(self.interval):
+            deltas = []
+            for path in self.paths:
+                deltas.extend(self._compare(path))
+            self._emit(deltas)
+
+    def _run_inotify(self, libc):
+        import ctypes
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            watches = {}
+            for path in self.paths:
+                wd = libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK)
+                if wd >= 0:
+                    watches[wd] = path
+            if not watches:
+                raise OSError(ctypes.get_errno(), "no directory could be watched")
+            self.backend = "inotify"
+
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.interval)
+                if not ready:
+                    continue
+                # Let a burst of writes settle before reporting
+                self._stop.wait(0.1)
+                changed = {}
+                rescan = set()
+                while True:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        break
+                    offset = 0
+                    while offset + _EVENT_HEADER.size <= len(data):
+                        wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                        offset += _EVENT_HEADER.size
+                        name = data[offset:offset + length].rstrip(b'\0')
+                        offset += length
+                        if mask & IN_Q_OVERFLOW:
+                            rescan.update(watches.values())
+                        elif wd in watches and name:
+                            changed.setdefault(watches[wd], set()).add(os.fsdecode(name))
+                        elif wd in watches and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                            rescan.add(watches[wd])
+                deltas = []
+                for path in self.paths:
+                    if path in rescan:
+                        deltas.extend(self._compare(path))
+                    elif path in changed:
+                        deltas.extend(self._compare(path, changed[path]))
+                self._emit(deltas)
+        finally:
+            os.close(fd)
+
+
+class EventHub:
+    """Fan out events to server-sent event subscribers"""
+
+    def __init__(self, max_pending=256):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # A stalled client gets told to reload instead of growing the queue
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait({"type": "resync"})
+
+    def stream(self, keepalive=15.0):
+        """Yield server-sent event frames for one subscriber"""
+        q = self.subscribe()
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = q.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(q)
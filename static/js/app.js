@@ -2,7 +2,18 @@
 const App = {
     // State
     config: null,
-    shaders: [],
+    
+    // Shader list paging
+    pageSize: 100,
+    rowHeight: 64,
+    listQuery: { sort: 'name', q: '' },
+    queryVersion: 0,
+    listTotal: 0,
+    pages: {},
+    pageEtags: {},
+    pendingPages: {},
+    renderQueued: false,
+    patchTimer: null,
     
     // Initialize the application
     init: async function() {
@@ -19,6 +30,7 @@ const App = {
             await this.loadConfig();
             this.setupEventListeners();
             this.loadShaders();
+            this.watchShaders();
             this.setupTheme();
             
             // Show home tab by default
@@ -87,47 +99,223 @@ const App = {
         }
     },
     
-    // Load shaders from server
-    loadShaders: async function() {
+    // Load shaders from server, revalidating the visible pages
+    loadShaders: async function(refresh = false) {
         try {
-            const response = await fetch('/api/shaders');
-            const shaders = await response.json();
-            this.shaders = shaders;
-            
-            // Update shader list
-            const shaderList = document.getElementById('shader-list');
-            shaderList.innerHTML = '';
+            const visible = this.visiblePages();
             
-            shaders.forEach(shader => {
-                const li = document.createElement('li');
-                li.className = 'shader-item';
-                li.innerHTML = `
-                    <div class="shader-info">
-                        <span class="shader-name">${shader.name}</span>
-                        <span class="shader-details">
-                            Size: ${this.formatSize(shader.size)} | 
-                            Modified: ${shader.modified}
-                        </span>
-                    </div>
-                    <div class="shader-actions">
-                        <button class="btn btn-sm btn-primary apply-shader" data-path="${shader.path}">
-                            Apply
-                        </button>
-                    </div>
-                `;
-                shaderList.appendChild(li);
-                
-                // Add click handler for apply button
-                li.querySelector('.apply-shader').addEventListener('click', (e) => {
-                    this.applyShader(e.target.dataset.path);
-                });
+            // Pages out of view are simply fetched again when scrolled to
+            Object.keys(this.pages).forEach(page => {
+                if (!visible.includes(Number(page))) {
+                    delete this.pages[page];
+                    delete this.pageEtags[page];
+                }
             });
+            await Promise.all(visible.map(page => this.fetchPage(page, refresh && page === visible[0])));
+            this.renderShaderList();
         } catch (error) {
             console.error('Error loading shaders:', error);
             this.setStatus('Error loading shaders', 'error');
         }
     },
     
+    // Change sorting or filtering and start again from the top
+    setShaderQuery: function(query) {
+        Object.assign(this.listQuery, query);
+        this.queryVersion++;
+        this.pages = {};
+        this.pageEtags = {};
+        document.querySelector('.shader-list-container').scrollTop = 0;
+        this.loadShaders();
+    },
+    
+    // Fetch one page of the shader list, sending the cached ETag if any
+    fetchPage: function(page, refresh = false) {
+        if (this.pendingPages[page]) {
+            return this.pendingPages[page];
+        }
+        const params = new URLSearchParams({
+            offset: page * this.pageSize,
+            limit: this.pageSize,
+            sort: this.listQuery.sort
+        });
+        if (this.listQuery.q) {
+            params.set('q', this.listQuery.q);
+        }
+        if (refresh) {
+            params.set('refresh', '1');
+        }
+        const headers = {};
+        if (this.pages[page] && this.pageEtags[page]) {
+            headers['If-None-Match'] = this.pageEtags[page];
+        }
+        
+        const version = this.queryVersion;
+        const request = fetch('/api/shaders?' + params, { headers: headers, cache: 'no-store' })
+            .then(async response => {
+                if (response.status === 304 || version !== this.queryVersion) {
+                    return;
+                }
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                this.pages[page] = await response.json();
+                this.pageEtags[page] = response.headers.get('ETag');
+                this.listTotal = parseInt(response.headers.get('X-Total-Count') || '0', 10);
+                this.scheduleRender();
+            })
+            .finally(() => {
+                delete this.pendingPages[page];
+            });
+        this.pendingPages[page] = request;
+        return request;
+    },
+    
+    // Pages covering the rows currently scrolled into view
+    visiblePages: function() {
+        const container = document.querySelector('.shader-list-container');
+        const first = Math.floor(container.scrollTop / this.rowHeight);
+        const last = Math.ceil((container.scrollTop + container.clientHeight) / this.rowHeight);
+        const pages = [];
+        for (let page = Math.floor(first / this.pageSize); page <= Math.floor(last / this.pageSize); page++) {
+            pages.push(page);
+        }
+        return pages;
+    },
+    
+    // Render on the next animation frame, once per frame
+    scheduleRender: function() {
+        if (!this.renderQueued) {
+            this.renderQueued = true;
+            requestAnimationFrame(() => {
+                this.renderQueued = false;
+                this.renderShaderList();
+            });
+        }
+    },
+    
+    // Render only the rows in view; the list's height stands in for the rest
+    renderShaderList: function() {
+        const container = document.querySelector('.shader-list-container');
+        const shaderList = document.getElementById('shader-list');
+        shaderList.style.height = (this.listTotal * this.rowHeight) + 'px';
+        
+        const overscan = 5;
+        const first = Math.max(0, Math.floor(container.scrollTop / this.rowHeight) - overscan);
+        const last = Math.min(this.listTotal,
+            Math.ceil((container.scrollTop + container.clientHeight) / this.rowHeight) + overscan);
+        
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i < last; i++) {
+            const page = Math.floor(i / this.pageSize);
+            const items = this.pages[page];
+            if (!items) {
+                this.fetchPage(page).catch(error => console.error('Error loading shaders:', error));
+                continue;
+            }
+            const shader = items[i % this.pageSize];
+            if (shader) {
+                const li = this.createShaderItem(shader);
+                li.style.top = (i * this.rowHeight) + 'px';
+                fragment.appendChild(li);
+            }
+        }
+        shaderList.replaceChildren(fragment);
+    },
+    
+    // Build the list item for a shader
+    createShaderItem: function(shader) {
+        const li = document.createElement('li');
+        li.className = 'shader-item';
+        const manifest = shader.manifest;
+        const title = manifest && manifest.name ? manifest.name : shader.name;
+        const version = manifest && manifest.version ? ` v${manifest.version}` : '';
+        li.title = manifest && manifest.description ? manifest.description : shader.name;
+        const material = shader.material;
+        let materialDetails = '';
+        if (material && material.passes) {
+            materialDetails = ` | Passes: ${material.passes.length}`;
+            li.title += '\n' + material.passes.map(p => `${p.name}: ${p.stages.join(', ')}`).join('\n');
+        }
+        const verify = shader.verify;
+        let warning = '';
+        if (verify && verify.status === 'failed') {
+            li.classList.add('shader-damaged');
+            li.title += '\nVerification failed:\n' + verify.errors.join('\n');
+            warning = '<span class="shader-warning">Damaged</span>';
+        }
+        const icon = shader.icon
+            ? `<img class="shader-icon" src="/api/shaders/${encodeURIComponent(shader.icon.id)}/icon" alt="" loading="lazy">`
+            : '<div class="shader-icon shader-icon-empty"></div>';
+        li.innerHTML = `
+            ${icon}
+            <div class="shader-info">
+                <span class="shader-name">${this.escapeHtml(title + version)}</span>${warning}
+                <span class="shader-details">
+                    Size: ${this.formatSize(shader.size)} | 
+                    Modified: ${shader.modified}${this.escapeHtml(materialDetails)}
+                </span>
+            </div>
+            <div class="shader-actions">
+                <button class="btn btn-sm btn-primary apply-shader">
+                    Apply
+                </button>
+            </div>
+        `;
+        
+        // Add click handler for apply button
+        li.querySelector('.apply-shader').addEventListener('click', () => {
+            this.applyShader(shader.path);
+        });
+        return li;
+    },
+    
+    // Subscribe to live library changes pushed by the server
+    watchShaders: function() {
+        if (!window.EventSource) {
+            return;
+        }
+        const events = new EventSource('/api/shaders/events');
+        events.onmessage = (message) => {
+            const change = JSON.parse(message.data);
+            if (change.type === 'resync') {
+                this.loadShaders();
+            } else if (change.library) {
+                this.patchShaderList(change);
+            }
+        };
+    },
+    
+    // Apply one add/remove/modify change to the shader list
+    patchShaderList: function(change) {
+        if (change.type === 'modified' && change.entry) {
+            // Same position in the list, so patch the cached row in place
+            let found = false;
+            Object.values(this.pages).forEach(items => {
+                const index = items.findIndex(shader => shader.path === change.path);
+                if (index !== -1) {
+                    items[index] = change.entry;
+                    found = true;
+                }
+            });
+            if (found) {
+                this.scheduleRender();
+                return;
+            }
+        }
+        
+        // Rows moved; revalidate the visible pages once a burst of changes settles
+        clearTimeout(this.patchTimer);
+        this.patchTimer = setTimeout(() => this.loadShaders(), 200);
+    },
+    
+    // Escape text taken from pack files before inserting it as HTML
+    escapeHtml: function(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    },
+    
     // Format file size
     formatSize: function(bytes) {
         const sizes = ['B', 'KB', 'MB', 'GB'];
@@ -151,7 +339,7 @@ const App = {
                 body: JSON.stringify({ path: shaderPath })
             });
             
-            const result = await response.json();
+            const result = await this.waitForJob(await response.json());
             this.setStatus(result.message, result.status === 'ok' ? 'success' : 'error');
         } catch (error) {
             console.error('Error applying shader:', error);
@@ -159,6 +347,33 @@ const App = {
         }
     },
     
+    // Follow a background job until it finishes, showing its progress
+    waitForJob: async function(started) {
+        if (started.status !== 'ok' || !started.job_id) {
+            return started;
+        }
+        this.setStatus(started.message, 'info');
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 250));
+            const response = await fetch('/api/jobs/' + started.job_id);
+            const job = await response.json();
+            if (job.status === 'queued' || job.status === 'running') {
+                if (job.total > 0) {
+                    const percent = Math.floor(job.done * 100 / job.total);
+                    this.setStatus(`${started.message}: ${percent}%`, 'info');
+                }
+                continue;
+            }
+            if (job.status === 'done') {
+                return job.result;
+            }
+            if (job.status === 'cancelled') {
+                return { status: 'error', message: 'Operation cancelled' };
+            }
+            return job.result || { status: 'error', message: job.error };
+        }
+    },
+    
     // Import a shader
     importShader: async function() {
         try {
@@ -188,7 +403,7 @@ const App = {
                     body: JSON.stringify({ path: result.path })
                 });
                 
-                const importResult = await importResponse.json();
+                const importResult = await this.waitForJob(await importResponse.json());
                 this.setStatus(importResult.message, importResult.status === 'ok' ? 'success' : 'error');
                 
                 if (importResult.status === 'ok') {
@@ -249,7 +464,7 @@ const App = {
                 method: 'POST'
             });
             
-            const result = await response.json();
+            const result = await this.waitForJob(await response.json());
             this.setStatus(result.message, result.status === 'ok' ? 'success' : 'error');
             
             if (result.status === 'ok') {
@@ -305,7 +520,30 @@ const App = {
         const refreshBtn = document.getElementById('refresh-shaders-btn');
         if (refreshBtn) {
             refreshBtn.addEventListener('click', () => {
-                this.loadShaders();
+                this.loadShaders(true);
+            });
+        }
+        
+        // Virtualized shader list scrolling
+        const listContainer = document.querySelector('.shader-list-container');
+        if (listContainer) {
+            listContainer.addEventListener('scroll', () => this.scheduleRender());
+        }
+        
+        // Shader list filter and sort
+        const searchInput = document.getElementById('shader-search');
+        if (searchInput) {
+            let searchTimer = null;
+            searchInput.addEventListener('input', () => {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => this.setShaderQuery({ q: searchInput.value.trim() }), 150);
+            });
+        }
+        
+        const sortSelect = document.getElementById('shader-sort');
+        if (sortSelect) {
+            sortSelect.addEventListener('change', () => {
+                this.setShaderQuery({ sort: sortSelect.value });
             });
         }
         
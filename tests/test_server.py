@@ -0,0 +1,96 @@
+import http.client
+import socket
+import threading
+import unittest
+
+from src.server import serve_in_background
+
+
+def app(environ, start_response):
+    if environ['PATH_INFO'] == '/block':
+        app.entered.set()
+        app.release.wait(10)
+    body = ('%s %s' % (environ['REQUEST_METHOD'], environ['PATH_INFO'])).encode()
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', str(len(body)))])
+    return [body]
+
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        app.entered = threading.Event()
+        app.release = threading.Event()
+        self.server = serve_in_background(app, port=0, workers=1, queue_size=1, keepalive_timeout=5)
+        self.port = self.server.server_port
+
+    def tearDown(self):
+        app.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def connect(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+        self.addCleanup(conn.close)
+        return conn
+
+    def request(self, conn, method, path, body=None):
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response, response.read()
+
+    def test_keep_alive_reuses_connection(self):
+        conn = self.connect()
+        response, data = self.request(conn, 'GET', '/a')
+        sock = conn.sock
+        for path in ('/b', '/c'):
+            response, data = self.request(conn, 'GET', path)
+            self.assertEqual(data, b'GET ' + path.encode())
+            self.assertIsNone(response.getheader('Connection'))
+            self.assertIs(conn.sock, sock)
+
+    def test_unread_post_body_is_skipped(self):
+        conn = self.connect()
+        response, data = self.request(conn, 'POST', '/ignored', body=b'{"not": "read"}' * 100)
+        self.assertEqual(data, b'POST /ignored')
+        sock = conn.sock
+        response, data = self.request(conn, 'GET', '/next')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(data, b'GET /next')
+        self.assertIs(conn.sock, sock)
+
+    def test_head_then_get(self):
+        conn = self.connect()
+        response, data = self.request(conn, 'HEAD', '/a')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Length'), str(len(b'HEAD /a')))
+        self.assertEqual(data, b'')
+        sock = conn.sock
+        response, data = self.request(conn, 'GET', '/a')
+        self.assertEqual(data, b'GET /a')
+        self.assertIs(conn.sock, sock)
+
+    def test_full_queue_gets_503(self):
+        blocked = threading.Thread(target=lambda: self.request(self.connect(), 'GET', '/block'))
+        blocked.start()
+        self.assertTrue(app.entered.wait(5))
+        # The only worker is busy, this connection fills the queue
+        queued = socket.create_connection(('127.0.0.1', self.port), timeout=5)
+        self.addCleanup(queued.close)
+        queued.sendall(b'GET /queued HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+        response, data = self.request(self.connect(), 'GET', '/rejected')
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.getheader('Retry-After'), '1')
+        app.release.set()
+        blocked.join(5)
+        reply = b''
+        while True:
+            chunk = queued.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+        self.assertTrue(reply.startswith(b'HTTP/1.1 200'))
+        self.assertTrue(reply.endswith(b'GET /queued'))
+
+
+if __name__ == '__main__':
+    unittest.main()